@@ -7,14 +7,44 @@ from __future__ import annotations
 __all__ = (
     "isect_segments",
     "isect_polygon",
+    "isect_polyline",
+
+    # only intersections within a rectangle
+    "isect_segments_in_rect",
+
+    # multiple polygons in a single sweep, includes '(ring_id, edge_id)' with each intersection
+    "isect_polygons",
+
+    # pairs of polygons that intersect each other (not where)
+    "polygon_crossing_pairs",
+
+    # split segments at their intersections
+    "node_segments",
+    "node_segments_graph",
+
+    # intersections referencing input segments by index
+    "isect_segments_index_pairs",
+    "isect_segments_index_csr",
 
     # same as above but includes segments with each intersections
     "isect_segments_include_segments",
     "isect_polygon_include_segments",
+    "isect_polyline_include_segments",
+
+    # exact intersections for integer coordinates
+    "isect_segments_exact",
+    "isect_segments_exact_include_segments",
+
+    # exact intersections for float coordinates (filtered, exact only when needed)
+    "isect_segments_robust",
+    "isect_segments_robust_include_segments",
 
     # for testing only (correct but slow)
     "isect_segments__naive",
     "isect_polygon__naive",
+    "isect_polyline__naive",
+    "isect_polygons__naive",
+    "isect_segments_exact__naive",
 )
 
 # ----------------------------------------------------------------------------
@@ -39,9 +69,16 @@ USE_PARANOID = False
 # We use the term 'START_VERTICAL' for a vertical segment,
 # to differentiate it from START/END/INTERSECTION
 USE_VERTICAL = True
+
+# Store the nodes of the sweep-line & event queue trees in lists (see: ``RBTreeArena``),
+# instead of an object for each node.
+USE_TREE_ARENA = False
 # end defines!
 # ------------
 
+import sys
+from functools import cmp_to_key
+
 # ---------
 # Constants
 X, Y = 0, 1
@@ -51,6 +88,10 @@ X, Y = 0, 1
 
 NUMBER_TYPE = 'native'
 
+# Set when loading this module for another number type, see: ``number_type_module``.
+if "NUMBER_TYPE_OVERRIDE" in globals():
+    NUMBER_TYPE = NUMBER_TYPE_OVERRIDE
+
 if NUMBER_TYPE == 'native':
     Real = float
     NUM_EPS = Real("1e-10")
@@ -62,6 +103,11 @@ elif NUMBER_TYPE == 'decimal':
     decimal.getcontext().prec = 80
     NUM_EPS = Real("1e-10")
     NUM_INF = Real(float("inf"))
+elif NUMBER_TYPE == 'fraction':
+    from fractions import Fraction as Real
+    NUM_EPS = Real("1e-10")
+    # Fractions can't represent infinity, only used for comparison.
+    NUM_INF = float("inf")
 elif NUMBER_TYPE == 'numpy':
     import numpy
     Real = numpy.float64
@@ -83,6 +129,48 @@ NUM_EPS_SQ = NUM_EPS * NUM_EPS
 NUM_ZERO = Real(0.0)
 NUM_ONE = Real(1.0)
 
+# Number types which can be passed as ``number_type`` arguments.
+NUMBER_TYPES = ('native', 'decimal', 'fraction', 'numpy', 'gmpy2')
+
+# Modules loaded for other number types: {number_type: module, ...}
+_number_type_modules = {}
+
+
+def number_type_module(number_type):
+    """
+    Return a copy of this module using ``number_type``,
+    so numeric constants are bound once for each number type (instead of checking the type for each operation).
+    """
+    if number_type == NUMBER_TYPE:
+        return sys.modules[__name__]
+    module = _number_type_modules.get(number_type)
+    if module is None:
+        if number_type not in NUMBER_TYPES:
+            raise ValueError("number_type: expected one of %r, not %r" % (NUMBER_TYPES, number_type))
+        import types
+        import decimal
+        # Named as a sub-module of this module (so it can't shadow other modules).
+        module = types.ModuleType("%s.number_type_%s" % (__name__, number_type))
+        module.__file__ = __file__
+        module.NUMBER_TYPE_OVERRIDE = number_type
+        module.SWEEP_INTERRUPTED_OVERRIDE = SweepInterrupted
+        module.INTERSECTIONS_VIEW_OVERRIDE = IntersectionsView
+        # Don't change the callers decimal precision.
+        with decimal.localcontext():
+            exec(_number_type_module_code(), module.__dict__)
+        _number_type_modules[number_type] = module
+        # Registered, so functions & classes from the module can be pickled.
+        sys.modules[module.__name__] = module
+    return module
+
+
+def _number_type_module_code():
+    spec = sys.modules[__name__].__spec__
+    if spec is not None and spec.loader is not None:
+        return spec.loader.get_code(spec.name)
+    with open(__file__, "r", encoding="utf-8") as fh:
+        return compile(fh.read(), __file__, "exec")
+
 
 class Event:
     __slots__ = (
@@ -94,6 +182,12 @@ class Event:
         # we may remove or calculate slope on the fly
         "slope",
         "span",
+
+        # Index of the segment in the input,
+        # and the index of the segment connected to its end-point (or None).
+        # Used to skip testing edges which share a vertex (polygons & poly-lines).
+        "index",
+        "index_next",
     ) + (() if not USE_DEBUG else (
         # debugging only
         "other",
@@ -107,11 +201,13 @@ class Event:
         if USE_VERTICAL:
             START_VERTICAL = 3
 
-    def __init__(self, type, point, segment, slope):
+    def __init__(self, type, point, segment, slope, index=None, index_next=None):
         assert isinstance(point, tuple)
         self.type = type
         self.point = point
         self.segment = segment
+        self.index = index
+        self.index_next = index_next
 
         # will be None for INTERSECTION
         self.slope = slope
@@ -209,7 +305,85 @@ class Event:
         ))
 
 
+class IntersectionsView:
+    """
+    A read-only sequence of intersections, converting each point to float on access
+    (for number types other than float), so the results aren't stored a second time.
+
+    Items are points, or '(point, segments)' pairs when ``include_segments`` is set.
+    """
+    __slots__ = (
+        # {Point: set(Event, ...), ...}, see: ``SweepLine.intersections``.
+        "_intersections",
+        "_point_as_float",
+        "_include_segments",
+        # The intersection points, only created when indexing.
+        "_points",
+    )
+
+    def __init__(self, intersections, point_as_float, include_segments=False):
+        self._intersections = intersections
+        self._point_as_float = point_as_float
+        self._include_segments = include_segments
+        self._points = None
+
+    def _item_as_float(self, p):
+        point_as_float = self._point_as_float
+        if not self._include_segments:
+            return point_as_float(p)
+        return (
+            point_as_float(p),
+            [(point_as_float(event.segment[0]), point_as_float(event.segment[1])) for event in self._intersections[p]],
+        )
+
+    def __len__(self):
+        return len(self._intersections)
+
+    def __iter__(self):
+        return map(self._item_as_float, self._intersections)
+
+    def __getitem__(self, index):
+        points = self._points
+        if points is None:
+            points = self._points = list(self._intersections)
+        if isinstance(index, slice):
+            return [self._item_as_float(p) for p in points[index]]
+        return self._item_as_float(points[index])
+
+    def __eq__(self, other):
+        if isinstance(other, (list, IntersectionsView)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "%s(%r)" % (type(self).__name__, list(self))
+
+    def to_array(self):
+        """
+        Return the intersection points as a NumPy array of floats with shape ``(n, 2)``.
+        """
+        import numpy
+        point_as_float = self._point_as_float
+        return numpy.fromiter(
+            (value for p in self._intersections for value in point_as_float(p)),
+            dtype=numpy.float64,
+            count=len(self._intersections) * 2,
+        ).reshape(-1, 2)
+
+
+# Set when loading this module for another number type, so results can be compared for any number type.
+if "INTERSECTIONS_VIEW_OVERRIDE" in globals():
+    IntersectionsView = INTERSECTIONS_VIEW_OVERRIDE
+
+
 class SweepLine:
+    # The comparison function for events in the sweep-line.
+    _event_compare = staticmethod(Event.Compare)
+    # Check vertical segments against horizontal segments in the sweep-line.
+    _vertical_check_horizontal = True
+
     __slots__ = (
         # A map holding all intersection points mapped to the Events
         # that form these intersections.
@@ -217,6 +391,15 @@ class SweepLine:
         "intersections",
         "queue",
 
+        # Input segments ignored as duplicates mapped to the index of the segment used instead.
+        # {index: index, ...}
+        "aliases",
+        # The number of input segments ignored for having zero length.
+        "degenerate_count",
+        # The number of events handled (pairs of orthogonal segments & segment families are counted as events),
+        # only counted when the sweep has a ``SweepMonitor``.
+        "events_count",
+
         # Events (sorted set of ordered events, no values)
         #
         # note: START & END events are considered the same so checking if an event is in the tree
@@ -225,50 +408,115 @@ class SweepLine:
         # Instead, the END events are never added to the current sweep, and removing them also removes the start.
         "_events_current_sweep",
         # The point of the current Event.
+        "_current_event_point",
         "_current_event_point_x",
         # A flag to indicate if we're slightly before or after the line.
         "_before",
+        # The sweep stops after this point, intersections beyond it are ignored.
+        "_x_max",
+        # Vertical events handled at this X value (sorted by their start), see: ``_check_intersection_vertical``.
+        "_events_vertical_x",
+        "_events_vertical",
+
+        # Optional tolerance for merging near-coincident intersection points
+        # and a hash grid of intersection points, keyed by their coordinates divided by the tolerance.
+        # {(int, int): [Point, ...], ...}
+        "_snap_tolerance",
+        "_snap_grid",
     )
 
-    def __init__(self, queue: EventQueue):
-        self.intersections = {}
+    def __init__(self, queue: EventQueue, status_type=None):
+        """
+        :arg status_type: The type used for the sweep-line status, see: ``SweepStatus``.
+        """
         self.queue = queue
+        if status_type is None:
+            status_type = RBTreeArena if USE_TREE_ARENA else RBTree
+        self._events_current_sweep = status_type(cmp=self._event_compare, cmp_data=self)
+        self.clear()
+
+    def clear(self):
+        """
+        Clear the intersections & sweep-line status (not the queue), so the sweep-line can be reused.
+        """
+        # A new dict, since results may reference the intersections.
+        self.intersections = {}
+        self.aliases = {}
+        self.degenerate_count = 0
+        self.events_count = 0
 
+        self._current_event_point = None
         self._current_event_point_x = None
-        self._events_current_sweep = RBTree(cmp=Event.Compare, cmp_data=self)
+        self._events_current_sweep.clear()
         self._before = True
+        self._x_max = NUM_INF
+        self._events_vertical_x = None
+        self._events_vertical = ()
+
+        self._snap_tolerance = None
+        self._snap_grid = None
 
     def get_intersections(self):
         """
-        Return a list of unordered intersection points.
+        Return a list of unordered intersection points,
+        an ``IntersectionsView`` for number types other than float.
         """
         if Real is float:
             return list(self.intersections.keys())
         else:
-            return [(float(p[0]), float(p[1])) for p in self.intersections.keys()]
+            return IntersectionsView(self.intersections, self.point_as_float)
 
     # Not essential for implementing this algorithm, but useful.
     def get_intersections_with_segments(self):
         """
         Return a list of unordered intersection '(point, segment)' pairs,
-        where segments may contain 2 or more values.
+        where segments may contain 2 or more values,
+        an ``IntersectionsView`` for number types other than float.
         """
         if Real is float:
             return [
                 (p, [event.segment for event in event_set])
                 for p, event_set in self.intersections.items()
             ]
+        else:
+            return IntersectionsView(self.intersections, self.point_as_float, include_segments=True)
+
+    def get_intersections_with_indices(self):
+        """
+        Return a list of unordered intersection '(point, indices)' pairs,
+        where indices are the sorted input indices of the segments.
+        """
+        if Real is float:
+            return [
+                (p, sorted({event.index for event in event_set}))
+                for p, event_set in self.intersections.items()
+            ]
         else:
             return [
-                (
-                    (float(p[0]), float(p[1])),
-                    [((float(event.segment[0][0]), float(event.segment[0][1])),
-                      (float(event.segment[1][0]), float(event.segment[1][1])))
-                     for event in event_set],
-                )
+                ((float(p[0]), float(p[1])), sorted({event.index for event in event_set}))
                 for p, event_set in self.intersections.items()
             ]
 
+    def get_intersections_per_segment(self):
+        """
+        Return a dict mapping each intersected segment index to a list of unordered intersection points.
+        """
+        segments_isect = {}
+        for p, event_set in self.intersections.items():
+            if Real is not float:
+                p = (float(p[0]), float(p[1]))
+            for event in event_set:
+                # START & END events of a segment may both be included, skip the second.
+                points = segments_isect.get(event.index)
+                if points is None:
+                    segments_isect[event.index] = [p]
+                elif points[-1] is not p:
+                    points.append(p)
+        return segments_isect
+
+    def point_as_float(self, p):
+        return (float(p[X]), float(p[Y]))
+
     # Checks if an intersection exists between two Events 'a' and 'b'.
     def _check_intersection(self, a: Event, b: Event):
         # Return immediately in case either of the events is null, or
@@ -283,6 +531,11 @@ class SweepLine:
         if a is b:
             return
 
+        # Connected edges can only meet at their shared vertex, which is ignored.
+        if USE_IGNORE_SEGMENT_ENDINGS:
+            if a.index_next == b.index or b.index_next == a.index:
+                return
+
         # Get the intersection point between 'a' and 'b'.
         p = isect_seg_seg_v2_point(
             a.segment[0], a.segment[1],
@@ -304,6 +557,13 @@ class SweepLine:
 
                 return
 
+        # The sweep stops before this point is reached.
+        if p[X] > self._x_max:
+            return
+
+        if self._snap_grid is not None:
+            p = self._snap_point(p, self._current_event_point_x)
+
         # Add the intersection.
         events_for_point = self.intersections.pop(p, set())
         is_new = len(events_for_point) == 0
@@ -314,11 +574,37 @@ class SweepLine:
         # If the intersection occurs to the right of the sweep line, OR
         # if the intersection is on the sweep line and it's above the
         # current event-point, add it as a new Event to the queue.
-        if is_new and p[X] >= self._current_event_point_x:
+        # An intersection at the current event-point (a segment starting on another segment or a vertical)
+        # is only recorded, the segments starting there are already inserted in their order after the point.
+        if is_new and p[X] >= self._current_event_point_x and p != self._current_event_point:
             event_isect = Event(Event.Type.INTERSECTION, p, None, None)
             self.queue.offer(p, event_isect)
 
+    def _snap_point(self, p, x_min):
+        """
+        Return an intersection point within the snapping tolerance of ``p`` or ``p`` when none is found.
+
+        :arg x_min: Only points from this X value are used,
+           while sweeping this is the current X value,
+           since the segments of an intersection that's been handled can't be swapped.
+        """
+        tolerance = self._snap_tolerance
+        grid = self._snap_grid
+        x_cell = int(p[X] // tolerance)
+        y_cell = int(p[Y] // tolerance)
+        tolerance_sq = tolerance * tolerance
+        for x_cell_other in (x_cell - 1, x_cell, x_cell + 1):
+            for y_cell_other in (y_cell - 1, y_cell, y_cell + 1):
+                for p_other in grid.get((x_cell_other, y_cell_other), ()):
+                    if p_other == p:
+                        return p_other
+                    if p_other[X] >= x_min and len_squared_v2v2(p, p_other) <= tolerance_sq:
+                        return p_other
+        grid.setdefault((x_cell, y_cell), []).append(p)
+        return p
+
     def _sweep_to(self, p):
+        self._current_event_point = p
         if p[X] == self._current_event_point_x:
             # happens in rare cases,
             # we can safely ignore
@@ -382,14 +668,75 @@ class SweepLine:
 
         if not USE_IGNORE_SEGMENT_ENDINGS:
             if len(events_current) > 1:
-                for i in range(0, len(events_current) - 1):
-                    for j in range(i + 1, len(events_current)):
-                        self._check_intersection(
-                            events_current[i], events_current[j])
+                self._check_intersection_star(events_current)
+
+        if USE_VERTICAL and events_current[0].type == Event.Type.START_VERTICAL:
+            # All vertical segments at this X are handled together, see: ``EventQueue``.
+            self.handle_vertical(events_current)
+            return
 
         for e in events_current:
             self.handle_event(e)
 
+    def _check_intersection_star(self, events_current):
+        """
+        Check the segments meeting at the current point against each other.
+
+        Segments sharing an end-point only intersect there (unless they're parallel),
+        so rather than checking every pair, each segment is checked against one it isn't parallel to.
+        """
+        events = [e for e in events_current if e.type != Event.Type.INTERSECTION]
+        if len(events) < 2:
+            return
+        e_first = events[0]
+        e_other = None
+        for e in events:
+            if e.slope != e_first.slope:
+                e_other = e
+                break
+        for e in events[1:]:
+            if e.slope != e_first.slope:
+                self._check_intersection(e_first, e)
+            else:
+                self._check_intersection(e, e_other)
+
+    def handle_chain(self, e_end, e_start):
+        """
+        Handle the vertex between two connected segments of an x-monotone chain,
+        where ``e_end`` & ``e_start`` are the only events at this point.
+
+        Instead of removing & inserting, the ending segment is replaced by the starting segment
+        (keeping its place in the sweep-line), so the sweep-line holds one entry for each chain.
+
+        :return: False when the replacement can't be made
+           (the events must be handled as usual).
+        """
+        cmp = self._event_compare
+        self._before = True
+        try:
+            node, e_below, e_above = self._events_current_sweep.node_neighbors(e_end)
+        except KeyError:
+            return False
+
+        # Other segments (nearly) touching the vertex may be ordered differently after it.
+        self._before = False
+        if (
+                (e_below is not None and cmp(self, e_below, e_start) >= 0) or
+                (e_above is not None and cmp(self, e_start, e_above) >= 0)
+        ):
+            return False
+
+        self._events_current_sweep.node_key_set(node, e_start)
+        if USE_DEBUG:
+            e_end.in_sweep = e_end.other.in_sweep = False
+            e_start.in_sweep = e_start.other.in_sweep = True
+
+        self._check_intersection(e_start, e_above)
+        self._check_intersection(e_start, e_below)
+        if self._events_vertical_x == self._current_event_point_x:
+            self._check_intersection_vertical(e_start)
+        return True
+
     def handle_event(self, event):
         t = event.type
         if t == Event.Type.START:
@@ -404,6 +751,8 @@ class SweepLine:
             self._check_intersection(event, e_below)
             if USE_PARANOID:
                 self._check_intersection(e_above, e_below)
+            if self._events_vertical_x == self._current_event_point_x:
+                self._check_intersection_vertical(event)
 
         elif t == Event.Type.END:
             # print("  END")
@@ -423,6 +772,9 @@ class SweepLine:
             # print("  INTERSECTION")
             self._before = True
             event_set = self.intersections[event.point]
+            if self._reorder_intersection(event_set):
+                return
+            self._before = True
             # note: events_current aren't sorted.
             reinsert_stack = []  # Stack
             for e in event_set:
@@ -447,205 +799,2128 @@ class SweepLine:
                     self._check_intersection(e_above, e_below)
         elif (USE_VERTICAL and
               (t == Event.Type.START_VERTICAL)):
+            self.handle_vertical([event])
 
-            # just check sanity
-            assert event.segment[0][X] == event.segment[1][X]
-            assert event.segment[0][Y] <= event.segment[1][Y]
-
-            # In this case we only need to find all segments in this span.
-            y_above_max = event.segment[1][Y]
+    def _reorder_intersection(self, event_set):
+        """
+        Re-order the segments crossing at the current point (a contiguous range of the sweep-line)
+        by replacing the keys of their nodes, instead of removing & inserting each segment.
+        Only the segments either side of the range need to be checked for intersections.
 
-            # self.insert(event)
-            for e_above in self.above_all(event):
-                if e_above.type == Event.Type.START_VERTICAL:
-                    continue
-                y_above = e_above.y_intercept_x(
-                    self._current_event_point_x)
-                if USE_IGNORE_SEGMENT_ENDINGS:
-                    if y_above >= y_above_max - NUM_EPS:
-                        break
-                else:
-                    if y_above > y_above_max:
-                        break
-
-                # We know this intersects,
-                # so we could use a faster function now:
-                # ix = (self._current_event_point_x, y_above)
-                # ...however best use existing functions
-                # since it does all sanity checks on endpoints... etc.
-                self._check_intersection(event, e_above)
+        :return: False when the segments aren't contiguous (they must be removed & inserted).
+        """
+        events_sweep = self._events_current_sweep
+        key = cmp_to_key(lambda a, b: self._event_compare(self, a, b))
 
-            # self.remove(event)
+        events = [e for e in event_set if e.type == Event.Type.START]
+        if not events:
+            return False
+        events.sort(key=key)
+
+        nodes = []
+        e_above = None
+        for node in events_sweep.iter_nodes_from(events[0]):
+            e = events_sweep.node_key(node)
+            if e not in event_set:
+                e_above = e
+                break
+            nodes.append(node)
+        if not nodes:
+            return False
+        if len(nodes) != len(events):
+            # Segments which ended (or haven't started) aren't in the sweep-line,
+            # any others are separated from the range.
+            events_range = {events_sweep.node_key(node) for node in nodes}
+            for e in events:
+                if e not in events_range and e in events_sweep:
+                    return False
+        e_below = events_sweep.prev_key(events_sweep.node_key(nodes[0]), None)
+
+        self._before = False
+        events = sorted((events_sweep.node_key(node) for node in nodes), key=key)
+        if (
+                (e_below is not None and key(e_below) >= key(events[0])) or
+                (e_above is not None and key(events[-1]) >= key(e_above))
+        ):
+            return False
+        for node, e in zip(nodes, events):
+            events_sweep.node_key_set(node, e)
 
+        self._check_intersection(e_below, events[0])
+        self._check_intersection(events[-1], e_above)
+        return True
 
-class EventQueue:
-    __slots__ = (
-        # note: we only ever pop_min, this could use a 'heap' structure.
-        # The sorted map holding the points -> event list
-        # [Point: Event] (tree)
-        "events_scan",
-    )
+    def handle_vertical(self, events_vertical):
+        """
+        Check vertical segments (all at the current sweep position) against the sweep-line.
 
-    def __init__(self, segments):
-        self.events_scan = RBTree()
-        # segments = [s for s in segments if s[0][0] != s[1][0] and s[0][1] != s[1][1]]
+        :arg events_vertical: Vertical events sorted by their start.
 
-        for s in segments:
-            assert s[0][X] <= s[1][X]
+        Rather than scanning the sweep-line once per vertical segment,
+        the segments are merged with a single walk over the sweep-line (from the lowest start).
+        When no vertical segments span a gap, the walk skips ahead to the next start.
+        """
+        cmp = self._event_compare
+        events_sweep = self._events_current_sweep
 
-            slope = slope_v2v2(*s)
+        for event in events_vertical:
+            # just check sanity
+            assert event.segment[0][X] == event.segment[1][X]
+            assert event.segment[0][Y] <= event.segment[1][Y]
 
-            if s[0] == s[1]:
-                pass
-            elif USE_VERTICAL and (s[0][X] == s[1][X]):
-                e_start = Event(Event.Type.START_VERTICAL, s[0], s, slope)
+        # Segments starting on these vertical segments (above their lowest point) are checked when they start.
+        self._events_vertical_x = self._current_event_point_x
+        self._events_vertical = events_vertical
 
-                if USE_DEBUG:
-                    e_start.other = e_start  # FAKE, avoid error checking
+        # Compare as if before the current point, so vertical segments are below the segments passing through
+        # their lowest point (otherwise the walk would start above them).
+        self._before = True
 
-                self.offer(s[0], e_start)
-            else:
-                e_start = Event(Event.Type.START, s[0], s, slope)
-                e_end = Event(Event.Type.END, s[1], s, slope)
+        # Vertical events which span the current position of the walk (with their end).
+        active = []
+        i_pending = 0
+        i_pending_end = len(events_vertical)
 
-                if USE_DEBUG:
-                    e_start.other = e_end
-                    e_end.other = e_start
+        check_horizontal = self._vertical_check_horizontal
 
-                self.offer(s[0], e_start)
-                self.offer(s[1], e_end)
+        while i_pending != i_pending_end:
+            for e_above in events_sweep.iter_keys_from(events_vertical[i_pending]):
+                if e_above.type == Event.Type.START_VERTICAL:
+                    continue
+                check = check_horizontal or (e_above.segment[0][Y] != e_above.segment[1][Y])
+                while i_pending != i_pending_end and cmp(self, events_vertical[i_pending], e_above) <= 0:
+                    event = events_vertical[i_pending]
+                    active.append((event, event.segment[1][Y]))
+                    i_pending += 1
+
+                i_active = 0
+                while i_active != len(active):
+                    event, y_above_max = active[i_active]
+                    if self._is_above_vertical(e_above, y_above_max):
+                        del active[i_active]
+                        continue
+                    # We know this intersects,
+                    # so we could use a faster function now:
+                    # ix = (self._current_event_point_x, y_above)
+                    # ...however best use existing functions
+                    # since it does all sanity checks on endpoints... etc.
+                    if check:
+                        self._check_intersection(event, e_above)
+                    i_active += 1
+
+                if not active:
+                    # Skip ahead to the next vertical segment.
+                    break
+            else:
+                # No segments remain above.
+                break
 
-    def offer(self, p, e: Event):
+    def _check_intersection_vertical(self, event):
         """
-        Offer a new event ``s`` at point ``p`` in this queue.
-        """
-        existing = self.events_scan.setdefault(
-            p, ([], [], [], []) if USE_VERTICAL else
-            ([], [], []),
-        )
-        # Can use double linked-list for easy insertion at beginning/end
-        '''
-        if e.type == Event.Type.END:
-            existing.insert(0, e)
-        else:
-            existing.append(e)
-        '''
+        Check a segment starting at the current sweep position against the vertical segments at this position.
 
-        existing[e.type].append(e)
+        Vertical segments are handled at their lowest point,
+        before segments starting above it (on the vertical segment) are in the sweep-line.
+        """
+        y = event.segment[0][Y]
+        if not self._vertical_check_horizontal and y == event.segment[1][Y]:
+            return
+        for e_vertical in self._events_vertical:
+            (_x, y_min), (_x, y_max) = e_vertical.segment
+            if y_min >= y:
+                # Sorted by their start.
+                break
+            if y <= y_max:
+                self._check_intersection(event, e_vertical)
 
-    # return a set of events
-    def poll(self):
+    def _is_above_vertical(self, e_above, y_above_max):
         """
-        Get, and remove, the first (lowest) item from this queue.
+        Check if ``e_above`` is above the end of a vertical segment (at the current sweep position).
 
-        :return: the first (lowest) item from this queue.
-        :rtype: Point, Event pair.
+        Segments passing through the end are not above it (they're checked as intersections),
+        endings are ignored by ``_check_intersection``.
         """
-        assert len(self.events_scan) != 0
-        p, events_current = self.events_scan.pop_min()
-        return p, events_current
+        y_above = e_above.y_intercept_x(self._current_event_point_x)
+        return y_above - y_above_max > NUM_EPS
 
 
-def isect_segments_impl(segments, *, include_segments=False, validate=True) -> list:
-    # order points left -> right
-    if Real is float:
-        segments = [
-            # in nearly all cases, comparing X is enough,
-            # but compare Y too for vertical lines
-            (s[0], s[1]) if (s[0] <= s[1]) else
-            (s[1], s[0])
-            for s in segments]
+# -----------------------------------------------------------------------------
+# Exact Integer Sweep-Line
+#
+# For segments with integer coordinates, all comparisons are exact (no epsilon),
+# using integer arithmetic, intersection points are exact ``Fraction`` pairs.
+
+from fractions import Fraction
+from operator import index as as_int
+from math import (
+    frexp,
+    isfinite,
+    ldexp,
+)
+
+def y_intercept_x_exact(event, x_num, x_den):
+    """
+    Return the Y intercept of an event's segment at ``x_num / x_den`` as a ``(numerator, denominator)`` pair,
+    the denominator is always positive.
+    """
+    (x0, y0), (x1, y1) = event.segment
+    # Vertical events are only used for comparison (above_all check).
+    if x0 == x1:
+        return event.point[Y], 1
+    if x_num <= x0 * x_den:
+        return y0, 1
+    if x_num >= x1 * x_den:
+        return y1, 1
+    dx = x1 - x0
+    return y0 * dx * x_den + (x_num - x0 * x_den) * (y1 - y0), dx * x_den
+
+
+def event_compare_exact(sweep_line, this, that):
+    """
+    Exact version of ``Event.Compare`` for integer coordinates.
+    """
+    if this is that:
+        return 0
+    if USE_DEBUG:
+        if this.other is that:
+            return 0
+    current_point_x = sweep_line._current_event_point_x
+    x_num = current_point_x.numerator
+    x_den = current_point_x.denominator
+    this_num, this_den = y_intercept_x_exact(this, x_num, x_den)
+    that_num, that_den = y_intercept_x_exact(that, x_num, x_den)
+
+    delta_y = this_num * that_den - that_num * this_den
+    if delta_y != 0:
+        return -1 if (delta_y < 0) else 1
+
+    # Compare slopes, vertical segments (ordered bottom to top) have the greatest slope.
+    (this_x0, this_y0), (this_x1, this_y1) = this.segment
+    (that_x0, that_y0), (that_x1, that_y1) = that.segment
+    this_dx = this_x1 - this_x0
+    that_dx = that_x1 - that_x0
+    if this_dx == 0:
+        delta_slope = 0 if (that_dx == 0) else 1
+    elif that_dx == 0:
+        delta_slope = -1
     else:
-        segments = [
-            # in nearly all cases, comparing X is enough,
-            # but compare Y too for vertical lines
-            (
-                (Real(s[0][0]), Real(s[0][1])),
-                (Real(s[1][0]), Real(s[1][1])),
-            ) if (s[0] <= s[1]) else
-            (
-                (Real(s[1][0]), Real(s[1][1])),
-                (Real(s[0][0]), Real(s[0][1])),
-            )
-            for s in segments]
+        delta_slope = (this_y1 - this_y0) * that_dx - (that_y1 - that_y0) * this_dx
+    if delta_slope != 0:
+        if sweep_line._before:
+            return -1 if (delta_slope > 0) else 1
+        else:
+            return 1 if (delta_slope > 0) else -1
 
-    # Ensure segments don't have duplicates or single points, see: #24.
-    if validate:
-        segments_old = segments
-        segments = []
-        visited = set()
-        for s in segments_old:
-            # Ignore points.
-            if s[0] == s[1]:
-                continue
-            # Ignore duplicates.
-            if s in visited:
-                continue
-            visited.add(s)
-            segments.append(s)
-        del segments_old
+    if this_x0 != that_x0:
+        return -1 if (this_x0 < that_x0) else 1
+    if this_x1 != that_x1:
+        return -1 if (this_x1 < that_x1) else 1
+    return 0
 
-    queue = EventQueue(segments)
-    sweep_line = SweepLine(queue)
 
-    while len(queue.events_scan) > 0:
-        if USE_VERBOSE:
-            print(len(queue.events_scan), sweep_line._current_event_point_x)
-        p, e_ls = queue.poll()
-        for events_current in e_ls:
-            if events_current:
-                sweep_line._sweep_to(p)
-                sweep_line.handle(p, events_current)
+class SweepLineExact(SweepLine):
+    """
+    Sweep-line for segments with integer coordinates.
+    """
+    __slots__ = ()
 
-    if include_segments is False:
-        return sweep_line.get_intersections()
-    else:
-        return sweep_line.get_intersections_with_segments()
+    _event_compare = staticmethod(event_compare_exact)
+
+    def _check_intersection(self, a: Event, b: Event):
+        if (
+                (a is None or b is None) or
+                (a.type == Event.Type.INTERSECTION) or
+                (b.type == Event.Type.INTERSECTION)
+        ):
+            return
 
+        if a is b:
+            return
 
-def isect_polygon_impl(points, *, include_segments=False, validate=True) -> list:
-    n = len(points)
-    segments = [
-        (tuple(points[i]), tuple(points[(i + 1) % n]))
-        for i in range(n)
-    ]
-    return isect_segments_impl(segments, include_segments=include_segments, validate=validate)
+        # Connected edges can only meet at their shared vertex, which is ignored.
+        if USE_IGNORE_SEGMENT_ENDINGS:
+            if a.index_next == b.index or b.index_next == a.index:
+                return
 
+        p = isect_seg_seg_v2_point_exact(
+            a.segment[0], a.segment[1],
+            b.segment[0], b.segment[1],
+        )
 
-def isect_segments(segments, *, validate=True) -> list:
-    return isect_segments_impl(segments, include_segments=False, validate=validate)
+        if p is None:
+            return
 
+        # No epsilon needed, points are exact.
+        if USE_IGNORE_SEGMENT_ENDINGS:
+            if ((p == a.segment[0] or p == a.segment[1]) and
+                    (p == b.segment[0] or p == b.segment[1])):
+                return
 
-def isect_polygon(segments, *, validate=True) -> list:
-    return isect_polygon_impl(segments, include_segments=False, validate=validate)
+        # The sweep stops before this point is reached.
+        if p[X] > self._x_max:
+            return
 
+        events_for_point = self.intersections.pop(p, set())
+        is_new = len(events_for_point) == 0
+        events_for_point.add(a)
+        events_for_point.add(b)
+        self.intersections[p] = events_for_point
 
-def isect_segments_include_segments(segments, *, validate=True) -> list:
-    return isect_segments_impl(segments, include_segments=True, validate=validate)
+        if is_new and p[X] >= self._current_event_point_x and p != self._current_event_point:
+            event_isect = Event(Event.Type.INTERSECTION, p, None, None)
+            self.queue.offer(p, event_isect)
 
+    def _is_above_vertical(self, e_above, y_above_max):
+        current_point_x = self._current_event_point_x
+        y_num, y_den = y_intercept_x_exact(e_above, current_point_x.numerator, current_point_x.denominator)
+        return y_num > y_above_max * y_den
 
-def isect_polygon_include_segments(segments, *, validate=True) -> list:
-    return isect_polygon_impl(segments, include_segments=True, validate=validate)
 
+# -----------------------------------------------------------------------------
+# Filtered Sweep-Line
+#
+# Exact intersections for float coordinates,
+# floats are scaled by a power of two to integers (without any loss of precision),
+# comparisons are calculated with floats, only using exact arithmetic
+# when the result is within the error bounds of the float calculation.
 
-# ----------------------------------------------------------------------------
-# 2D math utilities
+# Unit round-off for double precision floats.
+FLOAT_EPS_UNIT = float.fromhex("0x1p-53")
+# Error bounds are scaled by this amount (larger than needed, to account for all rounding steps).
+FLOAT_ERR_BOUND = FLOAT_EPS_UNIT * 8.0
 
 
-def slope_v2v2(p1, p2):
-    if p1[X] == p2[X]:
-        if p1[Y] < p2[Y]:
-            return NUM_INF
+def y_intercept_x_float(event, x):
+    """
+    Return the approximate Y intercept of an event's segment at ``x``
+    and the error bounds of the result as a ``(y, error)`` pair.
+    """
+    (x0, y0), (x1, y1) = event.segment
+    if x0 == x1:
+        y = float(event.point[Y])
+        return y, abs(y) * FLOAT_ERR_BOUND
+    x0 = float(x0)
+    if x <= x0:
+        y = float(y0)
+        return y, (abs(y) + abs(event.slope) * (abs(x) + abs(x0))) * FLOAT_ERR_BOUND
+    x1 = float(x1)
+    if x >= x1:
+        y = float(y1)
+        return y, (abs(y) + abs(event.slope) * (abs(x) + abs(x1))) * FLOAT_ERR_BOUND
+    y0 = float(y0)
+    delta_x = x - x0
+    y = y0 + delta_x * event.slope
+    # Account for error in 'x' & 'x0' scaled by the slope (as well as error in the slope & sum).
+    return y, (abs(y) + abs(y0) + abs(event.slope) * (abs(x) + abs(x0) + delta_x)) * FLOAT_ERR_BOUND
+
+
+def event_compare_filtered(sweep_line, this, that):
+    """
+    Version of ``event_compare_exact`` which only uses exact arithmetic when needed.
+    """
+    if this is that:
+        return 0
+    if USE_DEBUG:
+        if this.other is that:
+            return 0
+    sweep_line.predicate_count += 1
+    x = sweep_line._current_event_point_x_float
+    # None when the sweep position is too large for a float.
+    if x is not None:
+        try:
+            this_y, this_err = y_intercept_x_float(this, x)
+            that_y, that_err = y_intercept_x_float(that, x)
+        except OverflowError:
+            # Scaled coordinates are too large for floats (with a wide range of exponents in the input).
+            pass
         else:
-            return -NUM_INF
-    else:
-        return (p2[Y] - p1[Y]) / (p2[X] - p1[X])
-
+            delta_y = this_y - that_y
+            if abs(delta_y) > this_err + that_err:
+                return -1 if (delta_y < 0.0) else 1
+    sweep_line.predicate_exact_count += 1
+    return event_compare_exact(sweep_line, this, that)
 
-def sub_v2v2(a, b):
-    return (
-        a[0] - b[0],
-        a[1] - b[1])
+
+def segments_float_to_int(segments):
+    """
+    Scale float coordinates by a power of two so all coordinates are integers,
+    return ``(segments, scale_exp)``.
+    """
+    exp_min = 0
+    for s in segments:
+        for p in s:
+            for v in p:
+                if not isfinite(v):
+                    raise ValueError("Non-finite coordinate: %r" % (v,))
+                if v != 0.0:
+                    exp_min = min(exp_min, frexp(v)[1])
+    # 53 bits of precision.
+    scale_exp = 53 - exp_min
+
+    def as_int_scaled(v):
+        mantissa, exp = frexp(v)
+        return int(ldexp(mantissa, 53)) << (exp - exp_min)
+
+    segments = [
+        (
+            (as_int_scaled(s[0][0]), as_int_scaled(s[0][1])),
+            (as_int_scaled(s[1][0]), as_int_scaled(s[1][1])),
+        )
+        for s in segments]
+    return segments, scale_exp
+
+
+class SweepLineFiltered(SweepLineExact):
+    """
+    Sweep-line for float segments scaled to integer coordinates (see ``segments_float_to_int``).
+    """
+    __slots__ = (
+        # Float approximation of '_current_event_point_x'.
+        "_current_event_point_x_float",
+        # The power of two the input was scaled by.
+        "scale_exp",
+
+        # Number of comparisons & the number of these that needed exact arithmetic.
+        "predicate_count",
+        "predicate_exact_count",
+    )
+
+    _event_compare = staticmethod(event_compare_filtered)
+
+    def clear(self):
+        super().clear()
+        self._current_event_point_x_float = None
+        self.scale_exp = 0
+        self.predicate_count = 0
+        self.predicate_exact_count = 0
+
+    def _sweep_to(self, p):
+        self._current_event_point = p
+        if p[X] == self._current_event_point_x:
+            return
+        self._current_event_point_x = p[X]
+        try:
+            self._current_event_point_x_float = float(p[X])
+        except OverflowError:
+            # Only use exact arithmetic, see: ``event_compare_filtered``.
+            self._current_event_point_x_float = None
+
+    def point_as_float(self, p):
+        scale = 1 << self.scale_exp
+        # Correctly rounded division.
+        return (
+            p[X].numerator / (p[X].denominator * scale),
+            p[Y].numerator / (p[Y].denominator * scale),
+        )
+
+
+# -----------------------------------------------------------------------------
+# Orthogonal Segments
+#
+# Intersections between horizontal & vertical segments are found with a separate sweep,
+# horizontal segments are a sorted list of their Y values, vertical segments are range queries,
+# so finding the intersecting pairs doesn't need any slopes, divisions or epsilon comparisons.
+
+from bisect import (
+    bisect_left,
+    bisect_right,
+    insort,
+)
+
+
+class SweepLineOrthogonal(SweepLine):
+    """
+    Sweep-line which doesn't check vertical segments against horizontal segments,
+    since these intersections are found by ``isect_segments_orthogonal``.
+    """
+    __slots__ = ()
+
+    _vertical_check_horizontal = False
+
+
+def segments_orthogonal_count(segments):
+    """
+    Return the number of ``(horizontal, vertical)`` segments.
+    """
+    count_horizontal = 0
+    count_vertical = 0
+    for s in segments:
+        if s[0][Y] == s[1][Y]:
+            if s[0][X] != s[1][X]:
+                count_horizontal += 1
+        elif s[0][X] == s[1][X]:
+            count_vertical += 1
+    return count_horizontal, count_vertical
+
+
+def events_orthogonal_from_segments(segments, segments_index, segments_next):
+    """
+    Return ``(events_horizontal, events_vertical)`` start events for segments (ordered left -> right)
+    which must all be horizontal or vertical.
+    """
+    events_horizontal = []
+    events_vertical = []
+    for s, index in zip(segments, segments_index):
+        index_next = None if segments_next is None else segments_next[index]
+        if s[0] == s[1]:
+            pass
+        elif s[0][X] == s[1][X]:
+            events_vertical.append(
+                Event(Event.Type.START_VERTICAL, s[0], s, slope_v2v2(*s), index, index_next))
+        else:
+            assert s[0][Y] == s[1][Y]
+            events_horizontal.append(
+                Event(Event.Type.START, s[0], s, slope_v2v2(*s), index, index_next))
+    return events_horizontal, events_vertical
+
+
+def orthogonal_pairs(horizontal, vertical):
+    """
+    Yield ``(i, j)`` index pairs for each horizontal ``(x_min, x_max, y)``
+    and vertical ``(x, y_min, y_max)`` which touch or cross.
+
+    Segments touching at their end-points are included, so at each X value,
+    horizontal segments are added before vertical segments are checked & removed afterwards.
+    """
+    ACTION_ADD, ACTION_CHECK, ACTION_REMOVE = 0, 1, 2
+    actions = []
+    for i, (x_min, x_max, _y) in enumerate(horizontal):
+        actions.append((x_min, ACTION_ADD, i))
+        actions.append((x_max, ACTION_REMOVE, i))
+    for j, (x, _y_min, _y_max) in enumerate(vertical):
+        actions.append((x, ACTION_CHECK, j))
+    actions.sort()
+
+    # Sorted ``(y, index)`` pairs for horizontal segments which span the current X value.
+    active = []
+    index_end = len(horizontal)
+
+    for _x, action, i in actions:
+        if action == ACTION_ADD:
+            insort(active, (horizontal[i][2], i))
+        elif action == ACTION_REMOVE:
+            del active[bisect_left(active, (horizontal[i][2], i))]
+        else:
+            _x, y_min, y_max = vertical[i]
+            for _y, j in active[bisect_left(active, (y_min, -1)):bisect_right(active, (y_max, index_end))]:
+                yield j, i
+
+
+def isect_events_add(intersections, a, b, sweep_line_snap=None):
+    """
+    Add the intersection between events ``a`` & ``b`` to ``intersections`` (when they intersect).
+
+    :arg sweep_line_snap: Optional sweep-line (once it's finished) to snap the intersection point
+       to an existing intersection within its tolerance.
+    """
+    # Connected edges can only meet at their shared vertex, which is ignored.
+    if USE_IGNORE_SEGMENT_ENDINGS:
+        if a.index_next == b.index or b.index_next == a.index:
+            return
+    a0, a1 = a.segment
+    b0, b1 = b.segment
+    # Use the same calculation as other intersections, so results are identical.
+    p = isect_seg_seg_v2_point(a0, a1, b0, b1)
+    if p is None:
+        return
+    if USE_IGNORE_SEGMENT_ENDINGS:
+        if ((len_squared_v2v2(p, a0) < NUM_EPS_SQ or
+             len_squared_v2v2(p, a1) < NUM_EPS_SQ) and
+            (len_squared_v2v2(p, b0) < NUM_EPS_SQ or
+             len_squared_v2v2(p, b1) < NUM_EPS_SQ)):
+            return
+    if sweep_line_snap is not None:
+        p = sweep_line_snap._snap_point(p, -NUM_INF)
+    events_for_point = intersections.get(p)
+    if events_for_point is None:
+        intersections[p] = {a, b}
+    else:
+        events_for_point.add(a)
+        events_for_point.add(b)
+
+
+def isect_segments_orthogonal(sweep_line, events_horizontal, events_vertical, monitor=None):
+    """
+    Add intersections between horizontal & vertical segments to ``sweep_line``.
+
+    :arg monitor: Optional ``SweepMonitor``, each pair of segments is counted as an event.
+    """
+    intersections = sweep_line.intersections
+    sweep_line_snap = None if sweep_line._snap_grid is None else sweep_line
+    pairs = orthogonal_pairs(
+        [(e.segment[0][X], e.segment[1][X], e.segment[0][Y]) for e in events_horizontal],
+        [(e.segment[0][X], e.segment[0][Y], e.segment[1][Y]) for e in events_vertical],
+    )
+    if monitor is not None:
+        pairs = monitor.pairs(sweep_line, pairs)
+    for i, j in pairs:
+        isect_events_add(intersections, events_vertical[j], events_horizontal[i], sweep_line_snap)
+
+
+# -----------------------------------------------------------------------------
+# Segment Families
+#
+# Hatching is made of a few families of parallel segments, which never intersect each other.
+# For each pair of families, coordinates are expressed along the direction of each family,
+# where the segments become horizontal & vertical, so they can be intersected as orthogonal segments.
+
+from math import (
+    atan2,
+    pi,
+)
+
+# The most families to intersect separately (each segment is checked against every other family).
+SEGMENT_FAMILIES_MAX = 4
+# Segments with directions within this angle (in radians) of each other are grouped into the same family.
+SEGMENT_FAMILIES_ANGLE = 1e-5
+# The smallest angle between families (as a squared sine), to avoid precision loss with nearly parallel families.
+SEGMENT_FAMILIES_SIN_SQ_MIN = Real(1e-6)
+# Range checks are expanded by this factor of the largest coordinate, to account for precision loss.
+SEGMENT_FAMILIES_MARGIN = Real(1e-9)
+
+
+def events_families_from_segments(segments, segments_index, segments_next):
+    """
+    Return a list of ``(direction, events)`` pairs, for each family of (nearly) parallel segments,
+    or None when there are too many families, they're nearly parallel,
+    or segments in a family overlap (so they might intersect each other).
+
+    :arg segments: Segments ordered left -> right.
+    """
+    items = []
+    for s, index in zip(segments, segments_index):
+        if s[0] == s[1]:
+            continue
+        items.append((atan2(float(s[1][Y] - s[0][Y]), float(s[1][X] - s[0][X])), s, index))
+    items.sort(key=lambda item: item[0])
+
+    families = []
+    angle_prev = None
+    for angle, s, index in items:
+        if angle_prev is None or angle - angle_prev > SEGMENT_FAMILIES_ANGLE:
+            # Allow for one more, which may be merged with the first family.
+            if len(families) == SEGMENT_FAMILIES_MAX + 1:
+                return None
+            families.append([])
+        families[-1].append((s, index))
+        angle_prev = angle
+    # Segments are ordered left -> right, so directions wrap around from pointing down to pointing up.
+    if len(families) > 1 and (items[0][0] + pi) - items[-1][0] <= SEGMENT_FAMILIES_ANGLE:
+        families[0] = families.pop() + families[0]
+    if len(families) > SEGMENT_FAMILIES_MAX:
+        return None
+
+    result = []
+    for family in families:
+        s = family[0][0]
+        direction = (s[1][X] - s[0][X], s[1][Y] - s[0][Y])
+        dx, dy = direction
+
+        # Ensure segments in this family are separated, ordering them by their offset from the direction.
+        spans = []
+        for s, _index in family:
+            v0 = dx * s[0][Y] - dy * s[0][X]
+            v1 = dx * s[1][Y] - dy * s[1][X]
+            spans.append((v0, v1) if v0 <= v1 else (v1, v0))
+        spans.sort()
+        margin = SEGMENT_FAMILIES_MARGIN * max(max(abs(v0), abs(v1)) for v0, v1 in spans)
+        v_max = spans[0][1]
+        for v0, v1 in spans[1:]:
+            if v0 <= v_max + margin:
+                return None
+            v_max = max(v_max, v1)
+
+        events = []
+        for s, index in family:
+            index_next = None if segments_next is None else segments_next[index]
+            events.append(Event(Event.Type.START, s[0], s, slope_v2v2(*s), index, index_next))
+        result.append((direction, events))
+
+    for i, ((ax, ay), _) in enumerate(result):
+        for (bx, by), _ in result[i + 1:]:
+            det = ax * by - ay * bx
+            if det * det < SEGMENT_FAMILIES_SIN_SQ_MIN * (ax * ax + ay * ay) * (bx * bx + by * by):
+                return None
+    return result
+
+
+def isect_segments_families(sweep_line, families, monitor=None):
+    """
+    Add intersections between each pair of segment families to ``sweep_line``.
+
+    When every segment of one family crosses every segment of the other (a uniform lattice),
+    all pairs are intersected directly.
+
+    :arg monitor: Optional ``SweepMonitor``, each pair of segments is counted as an event.
+    """
+    intersections = sweep_line.intersections
+    sweep_line_snap = None if sweep_line._snap_grid is None else sweep_line
+    for i, ((ax, ay), events_a) in enumerate(families):
+        for (bx, by), events_b in families[i + 1:]:
+            # Express points as ``u * a + v * b``, so ``events_a`` have a constant ``v``,
+            # and ``events_b`` have a constant ``u`` (apart from their difference in direction).
+            det = ax * by - ay * bx
+            coords_a = []
+            coords_b = []
+            for events, coords in ((events_a, coords_a), (events_b, coords_b)):
+                for e in events:
+                    p0, p1 = e.segment
+                    coords.append((
+                        (p0[X] * by - p0[Y] * bx) / det, (ax * p0[Y] - ay * p0[X]) / det,
+                        (p1[X] * by - p1[Y] * bx) / det, (ax * p1[Y] - ay * p1[X]) / det,
+                    ))
+            margin = SEGMENT_FAMILIES_MARGIN * max(
+                max(abs(value) for value in c)
+                for c in (coords_a + coords_b)
+            )
+            margin_u = margin + max(abs(u1 - u0) for u0, _v0, u1, _v1 in coords_b)
+            margin_v = margin + max(abs(v1 - v0) for _u0, v0, _u1, v1 in coords_a)
+            horizontal = [(min(u0, u1) - margin_u, max(u0, u1) + margin_u, v0) for u0, v0, u1, _v1 in coords_a]
+            vertical = [(u0, min(v0, v1) - margin_v, max(v0, v1) + margin_v) for u0, v0, _u1, v1 in coords_b]
+
+            if (
+                    max(h[0] for h in horizontal) <= min(v[0] for v in vertical) and
+                    min(h[1] for h in horizontal) >= max(v[0] for v in vertical) and
+                    max(v[1] for v in vertical) <= min(h[2] for h in horizontal) and
+                    min(v[2] for v in vertical) >= max(h[2] for h in horizontal)
+            ):
+                pairs = ((i_a, i_b) for i_a in range(len(events_a)) for i_b in range(len(events_b)))
+            else:
+                pairs = orthogonal_pairs(horizontal, vertical)
+            if monitor is not None:
+                pairs = monitor.pairs(sweep_line, pairs)
+
+            for i_a, i_b in pairs:
+                isect_events_add(intersections, events_a[i_a], events_b[i_b], sweep_line_snap)
+
+
+# -----------------------------------------------------------------------------
+# Array Preprocessing
+#
+# Segments passed as a NumPy array are ordered & validated with array operations,
+# instead of creating (and hashing) a tuple for every segment.
+# NumPy is optional, it's only used when the segments are already an array.
+
+def segments_is_array(segments):
+    numpy = sys.modules.get("numpy")
+    return numpy is not None and isinstance(segments, numpy.ndarray)
+
+
+def segments_preprocess_array(segments, validate):
+    """
+    Order the points of each segment left -> right for a NumPy array of segments (with shape ``(n, 2, 2)``),
+    when ``validate`` is true zero length & duplicate segments are removed.
+
+    :return: ``(segments, segments_index, aliases, degenerate_count)``,
+       where ``segments_index`` is None when the segments aren't validated, see: ``isect_segments_sweep``.
+    """
+    import numpy
+    # Copy, the input is never modified.
+    a = numpy.array(segments, dtype=numpy.float64).reshape(-1, 4)
+    # in nearly all cases, comparing X is enough,
+    # but compare Y too for vertical lines
+    flip = (a[:, 0] > a[:, 2]) | ((a[:, 0] == a[:, 2]) & (a[:, 1] > a[:, 3]))
+    a[flip] = a[flip][:, (2, 3, 0, 1)]
+
+    segments_index = None
+    aliases = {}
+    degenerate_count = 0
+    if validate:
+        # Ignore points.
+        index = numpy.flatnonzero((a[:, 0] != a[:, 2]) | (a[:, 1] != a[:, 3]))
+        degenerate_count = len(a) - len(index)
+        a = a[index]
+        # Ignore duplicates, sorting places them next to each other.
+        # Only segments which share their first X value need to be sorted by all coordinates
+        # (ties are sorted by position, so the first of each run of duplicates has the lowest index).
+        order = numpy.argsort(a[:, 0], kind='stable')
+        x_sorted = a[order, 0]
+        is_tie = x_sorted[1:] == x_sorted[:-1]
+        del x_sorted
+        if is_tie.any():
+            is_candidate = numpy.zeros(len(order), dtype=bool)
+            is_candidate[1:] = is_tie
+            is_candidate[:-1] |= is_tie
+            order = order[is_candidate]
+            a_sorted = a[order]
+            order = order[numpy.lexsort((order, a_sorted[:, 3], a_sorted[:, 2], a_sorted[:, 1], a_sorted[:, 0]))]
+            a_sorted = a[order]
+            is_first = numpy.ones(len(order), dtype=bool)
+            numpy.any(a_sorted[1:] != a_sorted[:-1], axis=1, out=is_first[1:])
+            del a_sorted
+            if not is_first.all():
+                # The position (in ``order``) of the first segment of each run.
+                first = numpy.maximum.accumulate(numpy.where(is_first, numpy.arange(len(order)), 0))
+                is_duplicate = ~is_first
+                aliases = dict(zip(
+                    index[order[is_duplicate]].tolist(),
+                    index[order[first[is_duplicate]]].tolist(),
+                ))
+                keep = numpy.ones(len(a), dtype=bool)
+                keep[order[is_duplicate]] = False
+                a = a[keep]
+                index = index[keep]
+        segments_index = index.tolist()
+
+    segments = [((x0, y0), (x1, y1)) for x0, y0, x1, y1 in a.tolist()]
+    return segments, segments_index, aliases, degenerate_count
+
+
+class EventQueue:
+    __slots__ = (
+        # The points of the input segments are known up-front,
+        # so they're sorted once instead of being added to a tree one at a time.
+        # Events for points which haven't been polled yet,
+        # most points have a single event which is stored directly,
+        # otherwise a list of events (in the order they were offered).
+        # {Point: Event | [Event, ...], ...}
+        "events_initial",
+        # The sorted points of ``events_initial`` & the index of the next point to poll.
+        # [Point, ...]
+        "points_initial",
+        "points_initial_index",
+
+        # note: we only ever pop_min, this could use a 'heap' structure.
+        # The sorted map holding points offered while sweeping (intersections) -> events,
+        # stored in the same way as ``events_initial``.
+        # [Point: Event | [Event, ...]] (tree)
+        "events_scan",
+    )
+
+    def __init__(self, segments=(), segments_index=None, segments_next=None, events_orthogonal=None):
+        """
+        :arg segments: Segments ordered left -> right, see: ``fill``.
+        """
+        self.events_initial = {}
+        self.points_initial = []
+        self.points_initial_index = 0
+        self.events_scan = RBTreeArena() if USE_TREE_ARENA else RBTree()
+        self.fill(segments, segments_index, segments_next, events_orthogonal)
+
+    def __len__(self):
+        return len(self.events_initial) + len(self.events_scan)
+
+    def clear(self):
+        self.events_initial.clear()
+        self.points_initial = []
+        self.points_initial_index = 0
+        self.events_scan.clear()
+
+    def fill(self, segments, segments_index=None, segments_next=None, events_orthogonal=None):
+        """
+        Add the events for ``segments``, the queue must be empty.
+
+        :arg segments: Segments ordered left -> right.
+        :arg segments_index: The input index for each segment (defaults to its position).
+        :arg segments_next: Optional map of input indices to the index of the connected
+           segment (or None), see ``Event.index_next``.
+        :arg events_orthogonal: Optional ``(events_horizontal, events_vertical)`` lists,
+           filled in with the start events of horizontal & vertical segments.
+        """
+        assert len(self) == 0
+        # segments = [s for s in segments if s[0][0] != s[1][0] and s[0][1] != s[1][1]]
+
+        if segments_index is None:
+            segments_index = range(len(segments))
+
+        events_initial = self.events_initial
+        offer_initial = EventQueue._offer_initial
+
+        # Vertical segments are grouped by their X value so they can be checked together,
+        # see: ``SweepLine.handle_vertical``.
+        events_vertical_map = {}
+
+        for s, index in zip(segments, segments_index):
+            assert s[0][X] <= s[1][X]
+
+            slope = slope_v2v2(*s)
+            index_next = None if segments_next is None else segments_next[index]
+
+            if s[0] == s[1]:
+                pass
+            elif USE_VERTICAL and (s[0][X] == s[1][X]):
+                e_start = Event(Event.Type.START_VERTICAL, s[0], s, slope, index, index_next)
+
+                if USE_DEBUG:
+                    e_start.other = e_start  # FAKE, avoid error checking
+
+                events_vertical_map.setdefault(s[0][X], []).append(e_start)
+                if events_orthogonal is not None:
+                    events_orthogonal[1].append(e_start)
+            else:
+                e_start = Event(Event.Type.START, s[0], s, slope, index, index_next)
+                e_end = Event(Event.Type.END, s[1], s, slope, index, index_next)
+
+                if USE_DEBUG:
+                    e_start.other = e_end
+                    e_end.other = e_start
+
+                offer_initial(events_initial, s[0], e_start)
+                offer_initial(events_initial, s[1], e_end)
+                if events_orthogonal is not None and s[0][Y] == s[1][Y]:
+                    events_orthogonal[0].append(e_start)
+
+        # All vertical events at an X value are offered at the lowest point.
+        for events_vertical in events_vertical_map.values():
+            events_vertical.sort(key=lambda e: (e.segment[0][Y], e.segment[1][Y]))
+            p = events_vertical[0].point
+            for e in events_vertical:
+                offer_initial(events_initial, p, e)
+
+        self.points_initial = sorted(events_initial)
+        self.points_initial_index = 0
+
+    @staticmethod
+    def _offer_initial(events_initial, p, e: Event):
+        existing = events_initial.setdefault(p, e)
+        if existing is e:
+            pass
+        elif existing.__class__ is list:
+            existing.append(e)
+        else:
+            # Only points shared by multiple events need a list.
+            events_initial[p] = [existing, e]
+
+    def offer(self, p, e: Event):
+        """
+        Offer a new event ``s`` at point ``p`` in this queue.
+        """
+        if p in self.events_initial:
+            EventQueue._offer_initial(self.events_initial, p, e)
+            return
+        existing = self.events_scan.setdefault(p, e)
+        if existing is e:
+            pass
+        elif existing.__class__ is list:
+            existing.append(e)
+        else:
+            self.events_scan.insert(p, [existing, e])
+
+    # return a set of events
+    def poll(self):
+        """
+        Get, and remove, the first (lowest) item from this queue.
+
+        :return: the first (lowest) item from this queue.
+        :rtype: Point, sequence of events pair, ordered by ``Event.type``
+           (events of the same type keep the order they were offered in).
+        """
+        assert len(self) != 0
+        points_initial = self.points_initial
+        index = self.points_initial_index
+        events_scan = self.events_scan
+        # Points offered while sweeping are never in ``events_initial`` (so they're never equal).
+        if index < len(points_initial) and (len(events_scan) == 0 or points_initial[index] < events_scan.min_key()):
+            p = points_initial[index]
+            self.points_initial_index = index + 1
+            events_current = self.events_initial.pop(p)
+        else:
+            p, events_current = events_scan.pop_min()
+        if events_current.__class__ is list:
+            events_current.sort(key=lambda e: e.type)
+            return p, events_current
+        return p, (events_current,)
+
+
+# -----------------------------------------------------------------------------
+# Sweep Monitor
+#
+# Sweeps with many events or intersections (from untrusted input for example)
+# can report their progress, be cancelled or limited, checked every ``SweepMonitor.step`` events.
+
+from time import monotonic
+
+
+class SweepInterrupted(Exception):
+    """
+    Raised when a sweep is cancelled or exceeds a limit of its ``SweepMonitor``.
+
+    - ``reason``: One of ``'cancelled'``, ``'max_intersections'``, ``'max_events'`` or ``'deadline'``.
+    - ``sweep_line``: The ``SweepLine`` holding the intersections found so far.
+    - ``result``: The intersections found so far, as they would have been returned
+      (set by functions which return intersections, such as ``isect_segments``, otherwise None).
+    """
+
+    def __init__(self, reason, sweep_line):
+        super().__init__("sweep interrupted: %s" % reason)
+        self.reason = reason
+        self.sweep_line = sweep_line
+        self.result = None
+
+
+# Set when loading this module for another number type, so the exception can be caught for any number type.
+if "SWEEP_INTERRUPTED_OVERRIDE" in globals():
+    SweepInterrupted = SWEEP_INTERRUPTED_OVERRIDE
+
+
+class SweepMonitor:
+    """
+    Progress reporting, cancellation & limits for a sweep (each is optional),
+    pass as the ``monitor`` argument of ``isect_segments`` & similar functions.
+
+    :arg progress: Called as ``progress(x, queue_size, sweep_size, intersections_count)``,
+       where ``x`` is the position of the sweep-line as a float (None before the first event),
+       ``queue_size`` & ``sweep_size`` are the number of points in the event queue & segments in the sweep-line.
+    :arg step: The number of events between each check (& progress call).
+    :arg cancel: An object with an ``is_set()`` method (a ``threading.Event`` for example),
+       the sweep is cancelled once it's set.
+    :arg max_intersections: The most intersection points to find.
+    :arg max_events: The most events to handle (pairs of orthogonal segments & segment families are counted as events).
+    :arg deadline: A ``time.monotonic()`` value the sweep must finish by.
+
+    Limits are checked every ``step`` events, raising ``SweepInterrupted``,
+    so they may be exceeded by the events handled within a step.
+    """
+    __slots__ = (
+        "progress",
+        "step",
+        "cancel",
+        "max_intersections",
+        "max_events",
+        "deadline",
+    )
+
+    def __init__(
+            self, *,
+            progress=None,
+            step=1000,
+            cancel=None,
+            max_intersections=None,
+            max_events=None,
+            deadline=None,
+    ):
+        if not (step >= 1):
+            raise ValueError("step: expected a positive integer, not %r" % (step,))
+        self.progress = progress
+        self.step = step
+        self.cancel = cancel
+        self.max_intersections = max_intersections
+        self.max_events = max_events
+        self.deadline = deadline
+
+    def check(self, sweep_line):
+        """
+        Report progress, raising ``SweepInterrupted`` when the sweep is cancelled or exceeds a limit.
+        """
+        if self.progress is not None:
+            x = sweep_line._current_event_point_x
+            if x is not None:
+                x = sweep_line.point_as_float((x, x))[X]
+            self.progress(
+                x,
+                len(sweep_line.queue),
+                len(sweep_line._events_current_sweep),
+                len(sweep_line.intersections),
+            )
+        if self.cancel is not None and self.cancel.is_set():
+            reason = 'cancelled'
+        elif self.max_intersections is not None and len(sweep_line.intersections) > self.max_intersections:
+            reason = 'max_intersections'
+        elif self.max_events is not None and sweep_line.events_count > self.max_events:
+            reason = 'max_events'
+        elif self.deadline is not None and monotonic() >= self.deadline:
+            reason = 'deadline'
+        else:
+            return
+        raise SweepInterrupted(reason, sweep_line)
+
+    def pairs(self, sweep_line, pairs):
+        """
+        Yield ``pairs`` (of segments to intersect), counting each as an event, checked every ``step`` pairs.
+        """
+        step = self.step
+        count = 0
+        for pair in pairs:
+            yield pair
+            count += 1
+            if count == step:
+                sweep_line.events_count += count
+                count = 0
+                self.check(sweep_line)
+        sweep_line.events_count += count
+
+
+def isect_segments_sweep(
+        segments, *,
+        validate=True,
+        segments_next=None,
+        rect=None,
+        tolerance=None,
+        exact=False,
+        robust=False,
+        orthogonal=True,
+        families=True,
+        status=None,
+        ordered=False,
+        reuse=None,
+        monitor=None,
+) -> SweepLine:
+    """
+    Run the sweep over ``segments``, returning the ``SweepLine`` which holds the intersections.
+
+    ``segments`` may be a NumPy array with shape ``(n, 2, 2)``, see: ``segments_preprocess_array``.
+
+    :arg rect: Optional ``(x_min, y_min, x_max, y_max)`` bounds, segments outside the bounds are ignored
+       and the sweep stops after ``x_max``. Intersections outside the bounds may still be included.
+    :arg tolerance: Optional distance for merging near-coincident intersection points,
+       so each cluster of points is handled (and returned) once.
+    :arg exact: Use exact arithmetic, segments must have integer coordinates,
+       intersection points use ``Fraction`` coordinates.
+    :arg robust: Use exact arithmetic for float coordinates, scaled to integers.
+    :arg orthogonal: Find intersections between horizontal & vertical segments separately,
+       see: ``isect_segments_orthogonal``.
+    :arg families: Find intersections between families of parallel segments (when there are few of them)
+       without the sweep-line, see: ``isect_segments_families``.
+    :arg status: The type used for the sweep-line status, a key of ``SWEEP_STATUS_TYPES``
+       (a red-black tree by default).
+    :arg ordered: Order ``SweepLine.intersections`` by point (X, then Y).
+       Points are recorded in the order the sweep reaches them, so they're (nearly always) sorted already.
+    :arg reuse: Optional dict of sweep-lines from previous calls (filled in by this function),
+       which are cleared & reused instead of creating a new sweep-line, event queue & trees.
+       The returned sweep-line is only valid until the next call, see: ``Intersector``.
+    :arg monitor: Optional ``SweepMonitor`` for progress reporting, cancellation & limits,
+       raising ``SweepInterrupted`` (holding the intersections found so far) when the sweep is interrupted.
+    """
+    if status is None:
+        status_type = None
+    else:
+        status_type = SWEEP_STATUS_TYPES.get(status)
+        if status_type is None:
+            raise ValueError("status: expected one of %s, not %r" % (tuple(SWEEP_STATUS_TYPES), status))
+
+    scale_exp = 0
+    if robust:
+        segments, scale_exp = segments_float_to_int(segments)
+        exact = True
+
+    segments_index = None
+    aliases = {}
+    degenerate_count = 0
+
+    # order points left -> right
+    if Real is float and not exact and segments_is_array(segments):
+        segments, segments_index, aliases, degenerate_count = segments_preprocess_array(segments, validate)
+        # Already validated.
+        validate = False
+    elif exact:
+        if tolerance is not None:
+            raise ValueError("tolerance: not supported for exact intersections")
+        # Accepts any integer type (raising a TypeError for other numbers).
+        segments = [
+            (
+                (as_int(s[0][0]), as_int(s[0][1])),
+                (as_int(s[1][0]), as_int(s[1][1])),
+            )
+            for s in segments]
+        segments = [
+            (s[0], s[1]) if (s[0] <= s[1]) else
+            (s[1], s[0])
+            for s in segments]
+    elif Real is float:
+        segments = [
+            # in nearly all cases, comparing X is enough,
+            # but compare Y too for vertical lines
+            (s[0], s[1]) if (s[0] <= s[1]) else
+            (s[1], s[0])
+            for s in segments]
+    else:
+        segments = [
+            # in nearly all cases, comparing X is enough,
+            # but compare Y too for vertical lines
+            (
+                (Real(s[0][0]), Real(s[0][1])),
+                (Real(s[1][0]), Real(s[1][1])),
+            ) if (s[0] <= s[1]) else
+            (
+                (Real(s[1][0]), Real(s[1][1])),
+                (Real(s[0][0]), Real(s[0][1])),
+            )
+            for s in segments]
+
+    # Ensure segments don't have duplicates or single points, see: #24.
+    if validate:
+        segments_old = segments
+        segments = []
+        segments_index = []
+        visited = {}
+        for i, s in enumerate(segments_old):
+            # Ignore points.
+            if s[0] == s[1]:
+                degenerate_count += 1
+                continue
+            # Ignore duplicates.
+            i_visited = visited.setdefault(s, i)
+            if i_visited != i:
+                aliases[i] = i_visited
+                continue
+            segments.append(s)
+            segments_index.append(i)
+        del segments_old, visited
+
+    if rect is not None:
+        x_min, y_min, x_max, y_max = (Real(v) for v in rect)
+        if segments_index is None:
+            segments_index = range(len(segments))
+        segments_old = segments
+        segments_index_old = segments_index
+        segments = []
+        segments_index = []
+        for s, i in zip(segments_old, segments_index_old):
+            # Ignore segments with bounds outside the rectangle.
+            if s[0][X] > x_max or s[1][X] < x_min:
+                continue
+            if s[0][Y] <= s[1][Y]:
+                if s[0][Y] > y_max or s[1][Y] < y_min:
+                    continue
+            else:
+                if s[1][Y] > y_max or s[0][Y] < y_min:
+                    continue
+            segments.append(s)
+            segments_index.append(i)
+        del segments_old, segments_index_old
+
+    events_orthogonal = None
+    events_families = None
+    if not exact and (rect is None):
+        if segments_index is None:
+            segments_index = range(len(segments))
+        if families:
+            events_families = events_families_from_segments(segments, segments_index, segments_next)
+            if events_families is not None:
+                # The sweep-line isn't needed.
+                segments = segments_index = ()
+        if orthogonal and (events_families is None):
+            count_horizontal, count_vertical = segments_orthogonal_count(segments)
+            if count_horizontal and count_vertical:
+                if count_horizontal + count_vertical == len(segments):
+                    # Only horizontal & vertical segments, the sweep-line isn't needed.
+                    events_orthogonal = events_orthogonal_from_segments(segments, segments_index, segments_next)
+                    segments = segments_index = ()
+                else:
+                    events_orthogonal = ([], [])
+
+    if robust:
+        sweep_line_type = SweepLineFiltered
+    elif exact:
+        sweep_line_type = SweepLineExact
+    elif events_orthogonal is not None:
+        sweep_line_type = SweepLineOrthogonal
+    else:
+        sweep_line_type = SweepLine
+
+    sweep_line = None if reuse is None else reuse.get((sweep_line_type, status_type))
+    if sweep_line is None:
+        queue = EventQueue(segments, segments_index, segments_next, events_orthogonal)
+        sweep_line = sweep_line_type(queue, status_type)
+        if reuse is not None:
+            reuse[sweep_line_type, status_type] = sweep_line
+    else:
+        queue = sweep_line.queue
+        queue.clear()
+        queue.fill(segments, segments_index, segments_next, events_orthogonal)
+        sweep_line.clear()
+    if robust:
+        sweep_line.scale_exp = scale_exp
+    sweep_line.aliases = aliases
+    sweep_line.degenerate_count = degenerate_count
+    if rect is not None:
+        sweep_line._x_max = x_max
+    if tolerance is not None:
+        if not (tolerance > 0.0):
+            raise ValueError("tolerance: expected a positive number, not %r" % (tolerance,))
+        sweep_line._snap_tolerance = Real(tolerance)
+        sweep_line._snap_grid = {}
+
+    # Connected segments form chains, which can be continued without removing & inserting.
+    use_chains = USE_IGNORE_SEGMENT_ENDINGS and (segments_next is not None)
+
+    # Intersection points in the order the sweep reaches them.
+    points_ordered = [] if ordered else None
+    intersections = sweep_line.intersections
+
+    # Events are only counted with a monitor, checked before the first event & every ``monitor.step`` events.
+    events_check = 0
+
+    try:
+        while len(queue) > 0:
+            if USE_VERBOSE:
+                print(len(queue), sweep_line._current_event_point_x)
+            p, e_ls = queue.poll()
+            if p[X] > sweep_line._x_max:
+                break
+            if monitor is not None:
+                sweep_line.events_count += len(e_ls)
+                if sweep_line.events_count >= events_check:
+                    monitor.check(sweep_line)
+                    events_check = sweep_line.events_count + monitor.step
+            if use_chains and len(e_ls) == 2:
+                e_end, e_start = e_ls
+                if (
+                        e_end.type == Event.Type.END and
+                        e_start.type == Event.Type.START and
+                        (e_end.index_next == e_start.index or e_start.index_next == e_end.index)
+                ):
+                    sweep_line._sweep_to(p)
+                    if sweep_line.handle_chain(e_end, e_start):
+                        e_ls = ()
+            # Handle each run of events with the same type.
+            e_ls_len = len(e_ls)
+            i = 0
+            while i < e_ls_len:
+                e_type = e_ls[i].type
+                j = i + 1
+                while j < e_ls_len and e_ls[j].type == e_type:
+                    j += 1
+                sweep_line._sweep_to(p)
+                sweep_line.handle(p, e_ls if (j - i) == e_ls_len else e_ls[i:j])
+                i = j
+            if points_ordered is not None and p in intersections:
+                points_ordered.append(p)
+
+        if events_orthogonal is not None:
+            isect_segments_orthogonal(sweep_line, *events_orthogonal, monitor=monitor)
+        if events_families is not None:
+            isect_segments_families(sweep_line, events_families, monitor=monitor)
+    finally:
+        # Interrupted sweeps are ordered too (for the intersections found so far).
+        if points_ordered is not None:
+            if len(points_ordered) != len(intersections):
+                # Intersections found behind the sweep or without the sweep-line
+                # (orthogonal segments & segment families).
+                points_visited = set(points_ordered)
+                points_ordered.extend(p for p in intersections if p not in points_visited)
+                del points_visited
+            # Sorting is linear when the points are already sorted.
+            points_ordered.sort()
+            sweep_line.intersections = {p: intersections[p] for p in points_ordered}
+
+    return sweep_line
+
+
+# Sample at most this many segments when choosing the sweep axis.
+SWEEP_AXIS_SAMPLE_MAX = 4096
+# Segments steeper than this (relative to the sweep) are counted as perpendicular.
+SWEEP_AXIS_STEEP = 1e3
+# The cost of adding & removing a segment from the sweep-line
+# (relative to the cost of a segment which remains in the sweep-line).
+SWEEP_AXIS_SEGMENT_COST = 0.25
+# Only sweep along Y when its estimated cost is less than this factor of sweeping along X.
+SWEEP_AXIS_BIAS = 0.75
+
+
+def sweep_axis_choose(segments) -> str:
+    """
+    Return the axis to sweep along (``'X'`` or ``'Y'``), from a sample of ``segments``.
+
+    The cost of each axis is estimated from the number of segments added to the sweep-line
+    and the average number of segments in the sweep-line
+    (the length of each segment along the axis, relative to the extent of the sample).
+    Segments perpendicular to the sweep are never added to the sweep-line,
+    while nearly perpendicular segments are counted as always being in the sweep-line
+    since they are prone to precision error.
+    """
+    step = max(1, len(segments) // SWEEP_AXIS_SAMPLE_MAX)
+    sample = segments[::step]
+    if len(sample) == 0:
+        return 'X'
+
+    x_min = min(min(s[0][X], s[1][X]) for s in sample)
+    x_max = max(max(s[0][X], s[1][X]) for s in sample)
+    y_min = min(min(s[0][Y], s[1][Y]) for s in sample)
+    y_max = max(max(s[0][Y], s[1][Y]) for s in sample)
+    if x_max == x_min or y_max == y_min:
+        return 'X'
+
+    cost_x = 0.0
+    cost_y = 0.0
+    for s in sample:
+        dx = abs(s[1][X] - s[0][X])
+        dy = abs(s[1][Y] - s[0][Y])
+        if dx != 0.0:
+            cost_x += 1.0 if (dx * SWEEP_AXIS_STEEP <= dy) else (SWEEP_AXIS_SEGMENT_COST + dx / (x_max - x_min))
+        if dy != 0.0:
+            cost_y += 1.0 if (dy * SWEEP_AXIS_STEEP <= dx) else (SWEEP_AXIS_SEGMENT_COST + dy / (y_max - y_min))
+    return 'Y' if cost_y < cost_x * SWEEP_AXIS_BIAS else 'X'
+
+
+def segments_swap_xy(segments):
+    if segments_is_array(segments):
+        return segments[..., ::-1]
+    return [((s[0][Y], s[0][X]), (s[1][Y], s[1][X])) for s in segments]
+
+
+def isect_segments_result(sweep_line, *, include_segments, axis, ordered) -> list:
+    """
+    Return the intersections of ``sweep_line`` for ``isect_segments_impl``.
+    """
+    if include_segments is False:
+        result = sweep_line.get_intersections()
+        if axis == 'Y':
+            result = [(p[Y], p[X]) for p in result]
+            if ordered:
+                result.sort()
+    else:
+        result = sweep_line.get_intersections_with_segments()
+        if axis == 'Y':
+            result = [((p[Y], p[X]), segments_swap_xy(segments_isect)) for p, segments_isect in result]
+            if ordered:
+                result.sort(key=lambda item: item[0])
+    return result
+
+
+def isect_segments_impl(
+        segments, *,
+        include_segments=False,
+        validate=True,
+        segments_next=None,
+        tolerance=None,
+        number_type=None,
+        decimal_precision=None,
+        axis=None,
+        stats=None,
+        ordered=False,
+        reuse=None,
+        monitor=None,
+) -> list:
+    if decimal_precision is not None and number_type != 'decimal':
+        raise ValueError("decimal_precision: only supported for the 'decimal' number type, not %r" % (number_type,))
+    if number_type is not None and number_type != NUMBER_TYPE:
+        import decimal
+        # Calculate with the callers decimal context (unless the precision is given).
+        context = decimal.getcontext().copy()
+        if decimal_precision is not None:
+            context.prec = decimal_precision
+        with decimal.localcontext(context):
+            return number_type_module(number_type).isect_segments_impl(
+                segments,
+                include_segments=include_segments,
+                validate=validate,
+                segments_next=segments_next,
+                tolerance=tolerance,
+                axis=axis,
+                stats=stats,
+                ordered=ordered,
+                reuse=reuse,
+                monitor=monitor,
+            )
+
+    if axis is None:
+        axis = 'X'
+    elif axis == 'AUTO':
+        if not segments_is_array(segments):
+            segments = list(segments)
+        axis = sweep_axis_choose(segments)
+    elif axis not in {'X', 'Y'}:
+        raise ValueError("axis: expected 'X', 'Y' or 'AUTO', not %r" % axis)
+
+    if stats is not None:
+        stats["axis"] = axis
+
+    # Sweeping along Y is done by swapping X & Y (in and out).
+    if axis == 'Y':
+        segments = segments_swap_xy(segments)
+
+    try:
+        sweep_line = isect_segments_sweep(
+            segments,
+            validate=validate,
+            segments_next=segments_next,
+            tolerance=tolerance,
+            ordered=ordered,
+            reuse=reuse,
+            monitor=monitor,
+        )
+    except SweepInterrupted as ex:
+        # Include the intersections found so far.
+        ex.result = isect_segments_result(ex.sweep_line, include_segments=include_segments, axis=axis, ordered=ordered)
+        raise
+    if stats is not None:
+        stats["segments_degenerate"] = sweep_line.degenerate_count
+        stats["segments_duplicate"] = len(sweep_line.aliases)
+    return isect_segments_result(sweep_line, include_segments=include_segments, axis=axis, ordered=ordered)
+
+
+def polygon_segments(points, *, closed=True):
+    """
+    Return ``(segments, segments_next)`` for a polygon (or poly-line when ``closed`` is false),
+    where ``segments_next`` maps each edge index to the index of the edge that follows it.
+    """
+    n = len(points)
+    points = [tuple(p) for p in points]
+    if closed:
+        segments = [(points[i], points[(i + 1) % n]) for i in range(n)]
+        segments_next = (list(range(1, n)) + [0]) if n else []
+    else:
+        segments = [(points[i], points[i + 1]) for i in range(n - 1)]
+        segments_next = (list(range(1, n - 1)) + [None]) if n > 1 else []
+    return segments, segments_next
+
+
+def isect_polygon_impl(
+        points, *,
+        include_segments=False,
+        validate=True,
+        closed=True,
+        tolerance=None,
+        number_type=None,
+        decimal_precision=None,
+        axis=None,
+        stats=None,
+        ordered=False,
+        reuse=None,
+        monitor=None,
+) -> list:
+    segments, segments_next = polygon_segments(points, closed=closed)
+    return isect_segments_impl(
+        segments,
+        include_segments=include_segments,
+        validate=validate,
+        segments_next=segments_next,
+        tolerance=tolerance,
+        number_type=number_type,
+        decimal_precision=decimal_precision,
+        axis=axis,
+        stats=stats,
+        ordered=ordered,
+        reuse=reuse,
+        monitor=monitor,
+    )
+
+
+def isect_segments(
+        segments, *,
+        validate=True,
+        tolerance=None,
+        number_type=None,
+        decimal_precision=None,
+        axis=None,
+        stats=None,
+        ordered=False,
+        monitor=None,
+) -> list:
+    return isect_segments_impl(
+        segments,
+        include_segments=False,
+        validate=validate,
+        tolerance=tolerance,
+        number_type=number_type,
+        decimal_precision=decimal_precision,
+        axis=axis,
+        stats=stats,
+        ordered=ordered,
+        monitor=monitor,
+    )
+
+
+def isect_segments_in_rect(segments, x_min, y_min, x_max, y_max, *, validate=True) -> list:
+    """
+    Return a list of unordered intersection points within a rectangle (inclusive).
+
+    Only segments with bounds overlapping the rectangle are swept
+    and the sweep stops once it passes ``x_max``.
+    """
+    sweep_line = isect_segments_sweep(segments, validate=validate, rect=(x_min, y_min, x_max, y_max))
+    return [
+        p for p in sweep_line.get_intersections()
+        if (x_min <= p[X] <= x_max) and (y_min <= p[Y] <= y_max)
+    ]
+
+
+def isect_polygon(
+        segments, *,
+        validate=True,
+        tolerance=None,
+        number_type=None,
+        decimal_precision=None,
+        axis=None,
+        stats=None,
+        ordered=False,
+        monitor=None,
+) -> list:
+    return isect_polygon_impl(
+        segments,
+        include_segments=False,
+        validate=validate,
+        tolerance=tolerance,
+        number_type=number_type,
+        decimal_precision=decimal_precision,
+        axis=axis,
+        stats=stats,
+        ordered=ordered,
+        monitor=monitor,
+    )
+
+
+def isect_polyline(
+        points, *,
+        validate=True,
+        tolerance=None,
+        number_type=None,
+        decimal_precision=None,
+        axis=None,
+        stats=None,
+        ordered=False,
+        monitor=None,
+) -> list:
+    return isect_polygon_impl(
+        points,
+        include_segments=False,
+        validate=validate,
+        closed=False,
+        tolerance=tolerance,
+        number_type=number_type,
+        decimal_precision=decimal_precision,
+        axis=axis,
+        stats=stats,
+        ordered=ordered,
+        monitor=monitor,
+    )
+
+
+def isect_polygons(rings, *, validate=True, closed=True, ring_filter=None) -> list:
+    """
+    Intersect multiple rings (polygons with holes, multi-polygons) in a single sweep.
+
+    Return a list of unordered '(point, ids)' pairs,
+    where ids is a sorted list of '(ring_id, edge_id)' pairs.
+    Connected edges of the same ring are never tested against each other.
+
+    :arg closed: When false, rings are treated as poly-lines.
+    :arg ring_filter: Restrict the intersections returned:
+       ``None`` for all, ``'INTER'`` for intersections between different rings
+       and ``'INTRA'`` for intersections within a single ring.
+    """
+    if ring_filter not in {None, 'INTER', 'INTRA'}:
+        raise ValueError("ring_filter: expected None, 'INTER' or 'INTRA', not %r" % (ring_filter,))
+
+    segments = []
+    segments_next = []
+    # Input index -> (ring_id, edge_id).
+    segments_ring = []
+    for ring_id, points in enumerate(rings):
+        ring_segments, ring_next = polygon_segments(points, closed=closed)
+        offset = len(segments)
+        segments.extend(ring_segments)
+        segments_next.extend(None if i is None else i + offset for i in ring_next)
+        segments_ring.extend((ring_id, edge_id) for edge_id in range(len(ring_segments)))
+
+    sweep_line = isect_segments_sweep(segments, validate=validate, segments_next=segments_next)
+
+    # Edges shared between rings are only swept once (see ``isect_segments_index_pairs``),
+    # include the ignored duplicates with the edge used in their place.
+    # {index: [index, ...], ...}
+    segments_alias = {}
+    for index_alias, index in sweep_line.aliases.items():
+        segments_alias.setdefault(index, []).append(index_alias)
+
+    result = []
+    for p, indices in sweep_line.get_intersections_with_indices():
+        if segments_alias:
+            indices = sorted(indices + [
+                index_alias
+                for index in indices
+                for index_alias in segments_alias.get(index, ())
+            ])
+        ids = [segments_ring[i] for i in indices]
+        if ring_filter is not None:
+            ring_ids_len = len({ring_id for ring_id, _edge_id in ids})
+            if ring_filter == 'INTER':
+                # Only a single ring.
+                if ring_ids_len == 1:
+                    continue
+            else:
+                # Each edge is from a different ring.
+                if ring_ids_len == len(ids):
+                    continue
+        result.append((p, ids))
+    return result
+
+
+def polygon_bounds_overlap(polygons) -> list:
+    """
+    Return a list of booleans, true for each polygon
+    with bounds overlapping the bounds of any other polygon.
+    """
+    import heapq
+
+    bounds = [
+        (
+            min(p[X] for p in points), min(p[Y] for p in points),
+            max(p[X] for p in points), max(p[Y] for p in points),
+        ) if len(points) else None
+        for points in polygons
+    ]
+    overlap = [False] * len(polygons)
+
+    # Sweep the X bounds, only polygons with overlapping X bounds check their Y bounds.
+    active = {}
+    # (x_max, polygon_id) heap, for removing polygons behind the sweep.
+    active_heap = []
+    for poly_id in sorted(
+            (i for i, b in enumerate(bounds) if b is not None),
+            key=lambda i: bounds[i][0],
+    ):
+        x_min, y_min, x_max, y_max = bounds[poly_id]
+        while active_heap and active_heap[0][0] < x_min:
+            del active[heapq.heappop(active_heap)[1]]
+        for poly_id_other, (_, y_min_other, _, y_max_other) in active.items():
+            if y_min <= y_max_other and y_min_other <= y_max:
+                overlap[poly_id] = True
+                overlap[poly_id_other] = True
+        active[poly_id] = bounds[poly_id]
+        heapq.heappush(active_heap, (x_max, poly_id))
+    return overlap
+
+
+def polygon_crossing_pairs(polygons, *, validate=True) -> list:
+    """
+    Return a sorted list of '(polygon_id, polygon_id)' pairs (lowest id first)
+    for each pair of polygons with edges that intersect, each pair is only included once.
+
+    Polygons with bounds that don't overlap any other polygon are excluded before the sweep.
+    Edges shared by multiple polygons are only added to the sweep once.
+    """
+    segments = []
+    segments_next = []
+    # Segment index -> polygon ids (more than one for edges shared between polygons).
+    segments_poly = []
+    # Segment (ordered left -> right) -> segment index.
+    segments_lookup = {}
+
+    for poly_id, (points, overlap) in enumerate(zip(polygons, polygon_bounds_overlap(polygons))):
+        if not overlap:
+            continue
+        ring_segments, ring_next = polygon_segments(points)
+        ring_index = []
+        for s in ring_segments:
+            if not (s[0] <= s[1]):
+                s = (s[1], s[0])
+            index = segments_lookup.get(s)
+            if index is None:
+                index = segments_lookup[s] = len(segments)
+                segments.append(s)
+                segments_next.append(None)
+                segments_poly.append([poly_id])
+            elif segments_poly[index][-1] != poly_id:
+                segments_poly[index].append(poly_id)
+            ring_index.append(index)
+        for i, i_next in enumerate(ring_next):
+            index = ring_index[i]
+            if segments_next[index] is None and segments_poly[index][0] == poly_id:
+                segments_next[index] = ring_index[i_next]
+    del segments_lookup
+
+    sweep_line = isect_segments_sweep(segments, validate=validate, segments_next=segments_next)
+
+    pairs = set()
+    for p, event_set in sweep_line.intersections.items():
+        event_set = list(event_set)
+        # Edges which end at this point, edges which only touch at their end-points don't cross
+        # (matching the intersections ignored between two edges, see: ``USE_IGNORE_SEGMENT_ENDINGS``),
+        # so other edges passing through this point don't change the result.
+        event_ends = [
+            len_squared_v2v2(p, event.segment[0]) < NUM_EPS_SQ or
+            len_squared_v2v2(p, event.segment[1]) < NUM_EPS_SQ
+            for event in event_set
+        ]
+        for i, event in enumerate(event_set):
+            poly_ids = segments_poly[event.index]
+            for j in range(i + 1, len(event_set)):
+                if event_ends[i] and event_ends[j]:
+                    continue
+                event_other = event_set[j]
+                for poly_id_other in segments_poly[event_other.index]:
+                    for poly_id in poly_ids:
+                        if poly_id != poly_id_other:
+                            pairs.add((poly_id, poly_id_other) if poly_id < poly_id_other else
+                                      (poly_id_other, poly_id))
+    return sorted(pairs)
+
+
+def node_segments_iter(segments, *, validate=True):
+    """
+    Yield ``(index, points)`` for each segment, where ``points`` are the segment end-points
+    with intersections between them, ordered from the first point of the segment to the last.
+    """
+    segments_isect = isect_segments_sweep(segments, validate=validate).get_intersections_per_segment()
+
+    visited = set()
+    for index, (p0, p1) in enumerate(segments):
+        p0 = tuple(p0)
+        p1 = tuple(p1)
+        if validate:
+            # Match the segments ignored by the sweep.
+            if p0 == p1:
+                continue
+            s = (p0, p1) if (p0 <= p1) else (p1, p0)
+            if s in visited:
+                continue
+            visited.add(s)
+
+        points = segments_isect.get(index)
+        if points is None:
+            yield index, [p0, p1]
+            continue
+
+        # Order by the distance along the segment.
+        direction = sub_v2v2(p1, p0)
+        points.sort(key=lambda p: dot_v2v2(sub_v2v2(p, p0), direction))
+        points_ordered = [p0]
+        for p in points:
+            # Skip intersections with the segments own end-points (T-junctions) or other intersections.
+            if len_squared_v2v2(p, points_ordered[-1]) < NUM_EPS_SQ:
+                continue
+            if len_squared_v2v2(p, p1) < NUM_EPS_SQ:
+                continue
+            points_ordered.append(p)
+        points_ordered.append(p1)
+        yield index, points_ordered
+
+
+def node_segments(segments, *, validate=True) -> list:
+    """
+    Split segments at all intersections, returning a list of sub-segments (point-pairs)
+    in the order and direction of the input segments.
+    """
+    return [
+        (points[i], points[i + 1])
+        for _index, points in node_segments_iter(segments, validate=validate)
+        for i in range(len(points) - 1)
+    ]
+
+
+def node_segments_graph(segments, *, validate=True):
+    """
+    Split segments at all intersections, returning a planar graph ``(vertices, edges)``,
+    where ``vertices`` is a list of points (shared between edges)
+    and ``edges`` is a list of ``(vertex_index, vertex_index, segment_index)`` tuples.
+    """
+    vertices = []
+    vertices_lookup = {}
+    edges = []
+    for index, points in node_segments_iter(segments, validate=validate):
+        v_prev = None
+        for p in points:
+            v = vertices_lookup.get(p)
+            if v is None:
+                v = vertices_lookup[p] = len(vertices)
+                vertices.append(p)
+            if v_prev is not None:
+                edges.append((v_prev, v, index))
+            v_prev = v
+    return vertices, edges
+
+
+def isect_segments_index_pairs(segments, *, validate=True):
+    """
+    Return intersections referencing the input segments by index, as ``(points, pairs, aliases)``.
+
+    - ``points``: a list of intersection points, one for each pair.
+    - ``pairs``: a list of ``(index, index)`` pairs (lowest index first) for each pair of intersecting segments,
+      (points where more than 2 segments intersect include each pair).
+    - ``aliases``: a dict mapping the index of each duplicate segment ignored by ``validate``
+      to the index of the segment used in its place.
+    """
+    sweep_line = isect_segments_sweep(segments, validate=validate)
+    points = []
+    pairs = []
+    for p, indices in sweep_line.get_intersections_with_indices():
+        for i, index in enumerate(indices):
+            for index_other in indices[i + 1:]:
+                points.append(p)
+                pairs.append((index, index_other))
+    return points, pairs, sweep_line.aliases
+
+
+def isect_segments_index_csr(segments, *, validate=True):
+    """
+    Return intersections referencing the input segments by index,
+    as a compressed sparse row adjacency ``(points, offsets, point_indices, aliases)``.
+
+    - ``points``: a list of unique intersection points.
+    - ``offsets``: a list of ``len(segments) + 1`` offsets into ``point_indices``,
+      so the intersections of segment ``i`` are ``point_indices[offsets[i]:offsets[i + 1]]``.
+    - ``point_indices``: indices into ``points``.
+    - ``aliases``: see ``isect_segments_index_pairs``.
+    """
+    sweep_line = isect_segments_sweep(segments, validate=validate)
+    points = []
+    # Count the intersections for each segment (offset by one).
+    offsets = [0] * (len(segments) + 1)
+    isect = sweep_line.get_intersections_with_indices()
+    for p, indices in isect:
+        points.append(p)
+        for index in indices:
+            offsets[index + 1] += 1
+    for i in range(len(segments)):
+        offsets[i + 1] += offsets[i]
+    # Fill in the point indices, using a copy of the offsets as the write position for each segment.
+    point_indices = [0] * offsets[-1]
+    offsets_fill = offsets[:-1]
+    for point_index, (_p, indices) in enumerate(isect):
+        for index in indices:
+            point_indices[offsets_fill[index]] = point_index
+            offsets_fill[index] += 1
+    return points, offsets, point_indices, sweep_line.aliases
+
+
+def isect_segments_exact(segments, *, validate=True) -> IntersectionsView:
+    """
+    Return a sequence of unordered intersection points for segments with integer coordinates,
+    computed exactly (converted to float on access).
+    """
+    sweep_line = isect_segments_sweep(segments, validate=validate, exact=True)
+    return IntersectionsView(sweep_line.intersections, sweep_line.point_as_float)
+
+
+def isect_segments_exact_include_segments(segments, *, validate=True) -> IntersectionsView:
+    """
+    Same as ``isect_segments_exact``, returning '(point, segments)' pairs.
+    """
+    sweep_line = isect_segments_sweep(segments, validate=validate, exact=True)
+    return isect_segments_exact_with_segments(sweep_line)
+
+
+def isect_segments_exact_with_segments(sweep_line):
+    return IntersectionsView(sweep_line.intersections, sweep_line.point_as_float, include_segments=True)
+
+
+def isect_segments_robust_stats(sweep_line, stats):
+    if stats is not None:
+        stats["predicate_count"] = sweep_line.predicate_count
+        stats["predicate_exact_count"] = sweep_line.predicate_exact_count
+
+
+def isect_segments_robust(segments, *, validate=True, stats=None) -> IntersectionsView:
+    """
+    Return a sequence of unordered intersection points,
+    calculated exactly for float coordinates.
+
+    Comparisons are calculated using floats,
+    only using exact arithmetic when the result is within the float error bounds.
+
+    :arg stats: Optional dict, filled in with the number of comparisons (``predicate_count``)
+       and the number of these that needed exact arithmetic (``predicate_exact_count``).
+    """
+    sweep_line = isect_segments_sweep(segments, validate=validate, robust=True)
+    isect_segments_robust_stats(sweep_line, stats)
+    return IntersectionsView(sweep_line.intersections, sweep_line.point_as_float)
+
+
+def isect_segments_robust_include_segments(segments, *, validate=True, stats=None) -> IntersectionsView:
+    """
+    Same as ``isect_segments_robust``, returning '(point, segments)' pairs.
+    """
+    sweep_line = isect_segments_sweep(segments, validate=validate, robust=True)
+    isect_segments_robust_stats(sweep_line, stats)
+    return isect_segments_exact_with_segments(sweep_line)
+
+
+def isect_segments_include_segments(
+        segments, *,
+        validate=True,
+        tolerance=None,
+        number_type=None,
+        decimal_precision=None,
+        axis=None,
+        stats=None,
+        ordered=False,
+        monitor=None,
+) -> list:
+    return isect_segments_impl(
+        segments,
+        include_segments=True,
+        validate=validate,
+        tolerance=tolerance,
+        number_type=number_type,
+        decimal_precision=decimal_precision,
+        axis=axis,
+        stats=stats,
+        ordered=ordered,
+        monitor=monitor,
+    )
+
+
+def isect_polygon_include_segments(
+        segments, *,
+        validate=True,
+        tolerance=None,
+        number_type=None,
+        decimal_precision=None,
+        axis=None,
+        stats=None,
+        ordered=False,
+        monitor=None,
+) -> list:
+    return isect_polygon_impl(
+        segments,
+        include_segments=True,
+        validate=validate,
+        tolerance=tolerance,
+        number_type=number_type,
+        decimal_precision=decimal_precision,
+        axis=axis,
+        stats=stats,
+        ordered=ordered,
+        monitor=monitor,
+    )
+
+
+def isect_polyline_include_segments(
+        points, *,
+        validate=True,
+        tolerance=None,
+        number_type=None,
+        decimal_precision=None,
+        axis=None,
+        stats=None,
+        ordered=False,
+        monitor=None,
+) -> list:
+    return isect_polygon_impl(
+        points,
+        include_segments=True,
+        validate=validate,
+        closed=False,
+        tolerance=tolerance,
+        number_type=number_type,
+        decimal_precision=decimal_precision,
+        axis=axis,
+        stats=stats,
+        ordered=ordered,
+        monitor=monitor,
+    )
+
+
+# ----------------------------------------------------------------------------
+# Reusable Intersector
+
+class Intersector:
+    """
+    Find intersections for many inputs, reusing the sweep-line & event queue (with their trees) between calls.
+    Use this when intersecting many small inputs (polygons with few vertices for example),
+    where the overhead of each call is significant.
+
+    Methods match the functions with the same names,
+    the ``validate`` & ``tolerance`` arguments are used for all calls.
+    """
+    __slots__ = (
+        "validate",
+        "tolerance",
+        # Sweep-lines from previous calls, see: ``isect_segments_sweep``.
+        "_sweep_lines",
+    )
+
+    def __init__(self, *, validate=True, tolerance=None):
+        self.validate = validate
+        self.tolerance = tolerance
+        self._sweep_lines = {}
+
+    def clear(self):
+        """
+        Free the sweep-lines kept from previous calls.
+        """
+        self._sweep_lines.clear()
+
+    def isect_segments(self, segments, *, ordered=False, monitor=None) -> list:
+        return isect_segments_impl(
+            segments,
+            include_segments=False,
+            validate=self.validate,
+            tolerance=self.tolerance,
+            ordered=ordered,
+            reuse=self._sweep_lines,
+            monitor=monitor,
+        )
+
+    def isect_segments_include_segments(self, segments, *, ordered=False, monitor=None) -> list:
+        return isect_segments_impl(
+            segments,
+            include_segments=True,
+            validate=self.validate,
+            tolerance=self.tolerance,
+            ordered=ordered,
+            reuse=self._sweep_lines,
+            monitor=monitor,
+        )
+
+    def isect_polygon(self, points, *, ordered=False, monitor=None) -> list:
+        return isect_polygon_impl(
+            points,
+            include_segments=False,
+            validate=self.validate,
+            tolerance=self.tolerance,
+            ordered=ordered,
+            reuse=self._sweep_lines,
+            monitor=monitor,
+        )
+
+    def isect_polygon_include_segments(self, points, *, ordered=False, monitor=None) -> list:
+        return isect_polygon_impl(
+            points,
+            include_segments=True,
+            validate=self.validate,
+            tolerance=self.tolerance,
+            ordered=ordered,
+            reuse=self._sweep_lines,
+            monitor=monitor,
+        )
+
+    def isect_polyline(self, points, *, ordered=False, monitor=None) -> list:
+        return isect_polygon_impl(
+            points,
+            include_segments=False,
+            validate=self.validate,
+            closed=False,
+            tolerance=self.tolerance,
+            ordered=ordered,
+            reuse=self._sweep_lines,
+            monitor=monitor,
+        )
+
+    def isect_polyline_include_segments(self, points, *, ordered=False, monitor=None) -> list:
+        return isect_polygon_impl(
+            points,
+            include_segments=True,
+            validate=self.validate,
+            closed=False,
+            tolerance=self.tolerance,
+            ordered=ordered,
+            reuse=self._sweep_lines,
+            monitor=monitor,
+        )
+
+
+# ----------------------------------------------------------------------------
+# 2D math utilities
+
+
+def slope_v2v2(p1, p2):
+    if p1[X] == p2[X]:
+        if p1[Y] < p2[Y]:
+            return NUM_INF
+        else:
+            return -NUM_INF
+    else:
+        try:
+            return (p2[Y] - p1[Y]) / (p2[X] - p1[X])
+        except OverflowError:
+            # Integer coordinates (for exact arithmetic) with a slope too steep for a float.
+            return NUM_INF if ((p2[Y] > p1[Y]) == (p2[X] > p1[X])) else -NUM_INF
+
+
+def orient_v2v2v2(a, b, c):
+    """
+    Return the orientation of ``c`` relative to the line ``a -> b``,
+    positive when ``c`` is to the left, zero when co-linear.
+    """
+    return (b[X] - a[X]) * (c[Y] - a[Y]) - (b[Y] - a[Y]) * (c[X] - a[X])
+
+
+def sub_v2v2(a, b):
+    return (
+        a[0] - b[0],
+        a[1] - b[1])
 
 
 def dot_v2v2(a, b):
@@ -700,6 +2975,32 @@ def isect_seg_seg_v2_point(v1, v2, v3, v4, bias=NUM_ZERO):
     return vi
 
 
+def isect_seg_seg_v2_point_exact(v1, v2, v3, v4):
+    """
+    Exact version of ``isect_seg_seg_v2_point`` for integer coordinates,
+    returning a point with ``Fraction`` coordinates or None.
+    """
+    o1 = orient_v2v2v2(v1, v2, v3)
+    o2 = orient_v2v2v2(v1, v2, v4)
+    if (o1 > 0 and o2 > 0) or (o1 < 0 and o2 < 0):
+        return None
+    o3 = orient_v2v2v2(v3, v4, v1)
+    o4 = orient_v2v2v2(v3, v4, v2)
+    if (o3 > 0 and o4 > 0) or (o3 < 0 and o4 < 0):
+        return None
+
+    # Parallel or co-linear.
+    div = o1 - o2
+    if div == 0:
+        return None
+
+    # The factor along 'v3 -> v4' is 'o1 / div'.
+    return (
+        Fraction(v3[X] * div + (v4[X] - v3[X]) * o1, div),
+        Fraction(v3[Y] * div + (v4[Y] - v3[Y]) * o1, div),
+    )
+
+
 # ----------------------------------------------------------------------------
 # Simple naive line intersect, (for testing only)
 
@@ -743,7 +3044,31 @@ def isect_segments__naive(segments) -> list:
     return isect
 
 
-def isect_polygon__naive(points) -> list:
+def isect_segments_exact__naive(segments) -> list:
+    """
+    Brute force O(n2) version of ``isect_segments_exact`` for test validation.
+    """
+    isect = []
+    segments = [
+        ((as_int(s[0][0]), as_int(s[0][1])), (as_int(s[1][0]), as_int(s[1][1])))
+        for s in segments]
+
+    n = len(segments)
+    for i in range(n):
+        a0, a1 = segments[i]
+        for j in range(i + 1, n):
+            b0, b1 = segments[j]
+            ix = isect_seg_seg_v2_point_exact(a0, a1, b0, b1)
+            if ix is not None:
+                if USE_IGNORE_SEGMENT_ENDINGS:
+                    if (ix == a0 or ix == a1) and (ix == b0 or ix == b1):
+                        continue
+                isect.append((float(ix[X]), float(ix[Y])))
+
+    return isect
+
+
+def isect_polygon__naive(points, *, closed=True) -> list:
     """
     Brute force O(n2) version of ``isect_polygon`` for test validation.
     """
@@ -756,9 +3081,14 @@ def isect_polygon__naive(points) -> list:
     else:
         points = [(Real(p[0]), Real(p[1])) for p in points]
 
-    for i in range(n):
+    # Number of edges.
+    n_edges = n if closed else max(n - 1, 0)
+
+    for i in range(n_edges):
         a0, a1 = points[i], points[(i + 1) % n]
-        for j in range(i + 1, n):
+        # Skip the next edge (and the last edge when it connects back to the first),
+        # since edges that share a vertex never intersect.
+        for j in range(i + 2, (n_edges - 1) if (closed and i == 0) else n_edges):
             b0, b1 = points[j], points[(j + 1) % n]
             if a0 not in (b0, b1) and a1 not in (b0, b1):
                 ix = isect_seg_seg_v2_point(a0, a1, b0, b1)
@@ -776,6 +3106,52 @@ def isect_polygon__naive(points) -> list:
     return isect
 
 
+def isect_polyline__naive(points) -> list:
+    """
+    Brute force O(n2) version of ``isect_polyline`` for test validation.
+    """
+    return isect_polygon__naive(points, closed=False)
+
+
+def isect_polygons__naive(rings, *, closed=True) -> list:
+    """
+    Brute force O(n2) version of ``isect_polygons`` for test validation
+    (returns intersection points only).
+    """
+    segments = []
+    segments_next = []
+    for points in rings:
+        ring_segments, ring_next = polygon_segments(points, closed=closed)
+        offset = len(segments)
+        segments.extend(ring_segments)
+        segments_next.extend(None if i is None else i + offset for i in ring_next)
+
+    if Real is float:
+        pass
+    else:
+        segments = [((Real(a[0]), Real(a[1])), (Real(b[0]), Real(b[1]))) for a, b in segments]
+
+    isect = []
+    n = len(segments)
+    for i in range(n):
+        a0, a1 = segments[i]
+        for j in range(i + 1, n):
+            if segments_next[i] == j or segments_next[j] == i:
+                continue
+            b0, b1 = segments[j]
+            ix = isect_seg_seg_v2_point(a0, a1, b0, b1)
+            if ix is not None:
+                if USE_IGNORE_SEGMENT_ENDINGS:
+                    if ((len_squared_v2v2(ix, a0) < NUM_EPS_SQ or
+                         len_squared_v2v2(ix, a1) < NUM_EPS_SQ) and
+                        (len_squared_v2v2(ix, b0) < NUM_EPS_SQ or
+                         len_squared_v2v2(ix, b1) < NUM_EPS_SQ)):
+                        continue
+                isect.append(ix)
+
+    return isect
+
+
 # ----------------------------------------------------------------------------
 # Inline Libs
 #
@@ -846,6 +3222,52 @@ class _ABCTree(object):
             raise KeyError(str(key))
         return value
 
+    def node_key(self, node):
+        """T.node_key(node) -> the key of a node (see: ``node_neighbors`` & ``iter_nodes_from``)."""
+        return node.key
+
+    def node_key_set(self, node, key):
+        """T.node_key_set(node, key), replace the key of a node,
+        as long as this doesn't change the order of the tree.
+        """
+        node.key = key
+
+    def node_neighbors(self, key):
+        """T.node_neighbors(key) -> (node, prev_key, succ_key), where the keys are None
+        for the min and max key, raises KeyError if key does not exist.
+
+        The key of the node may be replaced (see: ``node_key_set``).
+        """
+        node = self._root
+        prev_node = None
+        succ_node = None
+        while node is not None:
+            cmp = self._cmp(self._cmp_data, key, node.key)
+            if cmp == 0:
+                break
+            elif cmp < 0:
+                succ_node = node
+                node = node.left
+            else:
+                prev_node = node
+                node = node.right
+
+        if node is None:
+            raise KeyError(str(key))
+        if node.left is not None:
+            prev_node = node.left
+            while prev_node.right is not None:
+                prev_node = prev_node.right
+        if node.right is not None:
+            succ_node = node.right
+            while succ_node.left is not None:
+                succ_node = succ_node.left
+        return (
+            node,
+            None if prev_node is None else prev_node.key,
+            None if succ_node is None else succ_node.key,
+        )
+
     def pop_item(self):
         """T.pop_item() -> (k, v), remove and return some (key, value) pair as a
         2-tuple; but raise KeyError if T is empty.
@@ -891,6 +3313,7 @@ class _ABCTree(object):
         # removed graingets version, because it was little slower on CPython and much slower on pypy
         # this version runs about 4x faster with pypy than the Cython version
         # Note: Code sharing of succ_item() and ceiling_item() is possible, but has always a speed penalty.
+        # Each node passed on the left is smaller than the last, so keys are compared once per level.
         node = self._root
         succ_node = None
         while node is not None:
@@ -898,8 +3321,7 @@ class _ABCTree(object):
             if cmp == 0:
                 break
             elif cmp < 0:
-                if (succ_node is None) or self._cmp(self._cmp_data, node.key, succ_node.key) < 0:
-                    succ_node = node
+                succ_node = node
                 node = node.left
             else:
                 node = node.right
@@ -911,13 +3333,9 @@ class _ABCTree(object):
         # found node of key
         if node.right is not None:
             # find smallest node of right subtree
-            node = node.right
-            while node.left is not None:
-                node = node.left
-            if succ_node is None:
-                succ_node = node
-            elif self._cmp(self._cmp_data, node.key, succ_node.key) < 0:
-                succ_node = node
+            succ_node = node.right
+            while succ_node.left is not None:
+                succ_node = succ_node.left
         elif succ_node is None:  # given key is biggest in tree
             if default is _sentinel:
                 raise KeyError(str(key))
@@ -931,6 +3349,7 @@ class _ABCTree(object):
         # removed graingets version, because it was little slower on CPython and much slower on pypy
         # this version runs about 4x faster with pypy than the Cython version
         # Note: Code sharing of prev_item() and floor_item() is possible, but has always a speed penalty.
+        # Each node passed on the right is greater than the last, so keys are compared once per level.
         node = self._root
         prev_node = None
 
@@ -941,8 +3360,7 @@ class _ABCTree(object):
             elif cmp < 0:
                 node = node.left
             else:
-                if (prev_node is None) or self._cmp(self._cmp_data, prev_node.key, node.key) < 0:
-                    prev_node = node
+                prev_node = node
                 node = node.right
 
         if node is None:  # stay at dead end (None)
@@ -952,13 +3370,9 @@ class _ABCTree(object):
         # found node of key
         if node.left is not None:
             # find biggest node of left subtree
-            node = node.left
-            while node.right is not None:
-                node = node.right
-            if prev_node is None:
-                prev_node = node
-            elif self._cmp(self._cmp_data, prev_node.key, node.key) < 0:
-                prev_node = node
+            prev_node = node.left
+            while prev_node.right is not None:
+                prev_node = prev_node.right
         elif prev_node is None:  # given key is smallest in tree
             if default is _sentinel:
                 raise KeyError(str(key))
@@ -1062,6 +3476,36 @@ class _ABCTree(object):
         # NOTE: would use `iter_keys` if it were supported.
         return (k for k, _v in self.iter_items(start_key, end_key, reverse=reverse))
 
+    def iter_keys_from(self, start_key):
+        """Iterates over keys in ascending order, starting with the first key >= start_key.
+
+        Unlike ``key_slice`` only the nodes from ``start_key`` onwards are visited.
+        """
+        for node in self.iter_nodes_from(start_key):
+            yield node.key
+
+    def iter_nodes_from(self, start_key):
+        """Iterates over nodes in ascending order, starting with the first key >= start_key.
+
+        The keys of the nodes may be replaced (see: ``node_key_set``).
+        """
+        node = self._root
+        stack = []
+        while node is not None:
+            if self._cmp(self._cmp_data, start_key, node.key) <= 0:
+                stack.append(node)
+                node = node.left
+            else:
+                node = node.right
+
+        while stack:
+            node = stack.pop()
+            yield node
+            node = node.right
+            while node is not None:
+                stack.append(node)
+                node = node.left
+
     def iter_items(self, start_key=None, end_key=None, reverse=False):
         """Iterates over the (key, value) items of the associated tree,
         in ascending order if reverse is True, iterate in descending order,
@@ -1140,167 +3584,1289 @@ class Node(object):
         self.key = None
         self.value = None
 
-    def __getitem__(self, key):
-        """N.__getitem__(key) <==> x[key], where key is 0 (left) or 1 (right)."""
-        return self.left if key == 0 else self.right
 
-    def __setitem__(self, key, value):
-        """N.__setitem__(key, value) <==> x[key]=value, where key is 0 (left) or 1 (right)."""
-        if key == 0:
-            self.left = value
+class RBTree(_ABCTree):
+    """
+    RBTree implements a balanced binary tree with a dict-like interface.
+
+    see: http://en.wikipedia.org/wiki/Red_black_tree
+
+    Insert & remove compare keys once for each level of the tree,
+    since the comparison is the most expensive part of the sweep-line.
+    """
+
+    def __init__(self, cmp=None, cmp_data=None):
+        super().__init__(cmp=cmp, cmp_data=cmp_data)
+        # False tree root, reused by insert & remove.
+        self._head = Node()
+
+    @staticmethod
+    def is_red(node):
+        if (node is not None) and node.red:
+            return True
+        else:
+            return False
+
+    @staticmethod
+    def jsw_single(root, direction):
+        if direction:
+            save = root.left
+            root.left = save.right
+            save.right = root
+        else:
+            save = root.right
+            root.right = save.left
+            save.left = root
+        root.red = True
+        save.red = False
+        return save
+
+    @staticmethod
+    def jsw_double(root, direction):
+        if direction:
+            root.left = RBTree.jsw_single(root.left, 0)
+        else:
+            root.right = RBTree.jsw_single(root.right, 1)
+        return RBTree.jsw_single(root, direction)
+
+    def _new_node(self, key, value):
+        """Create a new tree node."""
+        self._count += 1
+        return Node(key, value)
+
+    def insert(self, key, value):
+        """T.insert(key, value) <==> T[key] = value, insert key, value into tree."""
+        if self._root is None:  # Empty tree case
+            self._root = self._new_node(key, value)
+            self._root.red = False  # make root black
+            return
+
+        cmp = self._cmp
+        cmp_data = self._cmp_data
+        head = self._head  # False tree root
+        grand_parent = None
+        grand_grand_parent = head
+        parent = None  # parent
+        direction = 0
+        last = 0
+
+        # Set up helpers
+        head.right = node = self._root
+        # Search down the tree
+        while True:
+            is_new = node is None
+            if is_new:  # Insert new node at the bottom
+                node = self._new_node(key, value)
+                if direction:
+                    parent.right = node
+                else:
+                    parent.left = node
+            else:
+                left = node.left
+                right = node.right
+                if (left is not None and left.red) and (right is not None and right.red):  # Color flip
+                    node.red = True
+                    left.red = False
+                    right.red = False
+
+            # Fix red violation
+            if node.red and (parent is not None and parent.red):
+                if node is (parent.right if last else parent.left):
+                    save = RBTree.jsw_single(grand_parent, 1 - last)
+                else:
+                    save = RBTree.jsw_double(grand_parent, 1 - last)
+                if grand_grand_parent.right is grand_parent:
+                    grand_grand_parent.right = save
+                else:
+                    grand_grand_parent.left = save
+
+            # Stop if inserted (there is no need to compare the new node with its own key).
+            if is_new:
+                break
+
+            # Stop if found
+            cmp_result = cmp(cmp_data, key, node.key)
+            if cmp_result == 0:
+                node.value = value  # set new value for key
+                break
+
+            last = direction
+            direction = 0 if (cmp_result < 0) else 1
+            # Update helpers
+            if grand_parent is not None:
+                grand_grand_parent = grand_parent
+            grand_parent = parent
+            parent = node
+            node = node.right if direction else node.left
+
+        self._root = head.right  # Update root
+        self._root.red = False  # make root black
+        head.right = None
+
+    def remove(self, key):
+        """T.remove(key) <==> del T[key], remove item <key> from tree."""
+        if self._root is None:
+            raise KeyError(str(key))
+        cmp = self._cmp
+        cmp_data = self._cmp_data
+        head = self._head  # False tree root
+        node = head
+        node.right = self._root
+        parent = None
+        grand_parent = None
+        found = None  # Found item
+        direction = 1
+
+        # Search and push a red down
+        while True:
+            child = node.right if direction else node.left
+            if child is None:
+                break
+            last = direction
+
+            # Update helpers
+            grand_parent = parent
+            parent = node
+            node = child
+
+            if found is None:
+                cmp_result = cmp(cmp_data, key, node.key)
+                direction = 1 if (cmp_result > 0) else 0
+                # Save found node
+                if cmp_result == 0:
+                    found = node
+            else:
+                # Descend to the predecessor of the found node.
+                direction = 1
+
+            # Push the red node down
+            if direction:
+                child, child_other = node.right, node.left
+            else:
+                child, child_other = node.left, node.right
+            if not node.red and not (child is not None and child.red):
+                if child_other is not None and child_other.red:
+                    save = RBTree.jsw_single(node, direction)
+                    if last:
+                        parent.right = save
+                    else:
+                        parent.left = save
+                    parent = save
+                else:
+                    sibling = parent.left if last else parent.right
+                    if sibling is not None:
+                        if last:
+                            sibling_last, sibling_other = sibling.right, sibling.left
+                        else:
+                            sibling_last, sibling_other = sibling.left, sibling.right
+                        is_red_last = sibling_last is not None and sibling_last.red
+                        is_red_other = sibling_other is not None and sibling_other.red
+                        if not is_red_other and not is_red_last:
+                            # Color flip
+                            parent.red = False
+                            sibling.red = True
+                            node.red = True
+                        else:
+                            if is_red_last:
+                                save = RBTree.jsw_double(parent, last)
+                            else:
+                                save = RBTree.jsw_single(parent, last)
+                            if grand_parent.right is parent:
+                                grand_parent.right = save
+                            else:
+                                grand_parent.left = save
+                            # Ensure correct coloring
+                            save.red = True
+                            node.red = True
+                            save.left.red = False
+                            save.right.red = False
+
+        # Replace and remove if found
+        if found is not None:
+            found.key = node.key
+            found.value = node.value
+            child = node.right if node.left is None else node.left
+            if parent.right is node:
+                parent.right = child
+            else:
+                parent.left = child
+            node.free()
+            self._count -= 1
+
+        # Update root and make it black
+        self._root = head.right
+        head.right = None
+        if self._root is not None:
+            self._root.red = False
+        if found is None:
+            raise KeyError(str(key))
+
+
+# -----------
+# RBTreeArena
+
+class RBTreeArena(_ABCTree):
+    """
+    RBTreeArena is an ``RBTree`` storing its nodes in parallel lists (one for each field of ``Node``),
+    where a node is an index into the lists.
+
+    Removed nodes are added to a free list for reuse,
+    so the tree doesn't allocate an object for each key
+    & a copy of the tree (see: ``copy``) only copies the lists.
+
+    Index 0 is used as a black null node & 1 is the false tree root used by insert & remove.
+    """
+    # No node.
+    NIL = 0
+    # False tree root.
+    _HEAD = 1
+
+    def __init__(self, cmp=None, cmp_data=None):
+        super().__init__(cmp=cmp, cmp_data=cmp_data)
+        self._root = RBTreeArena.NIL
+        self._keys = [None, None]
+        self._values = [None, None]
+        self._left = [0, 0]
+        self._right = [0, 0]
+        self._red = [False, False]
+        self._free = []
+
+    def copy(self):
+        """T.copy() -> a copy of the tree (the keys & values aren't copied)."""
+        tree = RBTreeArena.__new__(RBTreeArena)
+        tree._cmp = self._cmp
+        tree._cmp_data = self._cmp_data
+        tree._root = self._root
+        tree._count = self._count
+        tree._keys = self._keys[:]
+        tree._values = self._values[:]
+        tree._left = self._left[:]
+        tree._right = self._right[:]
+        tree._red = self._red[:]
+        tree._free = self._free[:]
+        return tree
+
+    def clear(self):
+        """T.clear() -> None.  Remove all items from T."""
+        self.__init__(cmp=self._cmp, cmp_data=self._cmp_data)
+
+    def node_key(self, node):
+        return self._keys[node]
+
+    def node_key_set(self, node, key):
+        self._keys[node] = key
+
+    def _new_node(self, key, value):
+        """Create a new tree node (reusing a free node when possible)."""
+        self._count += 1
+        if self._free:
+            node = self._free.pop()
+            self._keys[node] = key
+            self._values[node] = value
+            self._red[node] = True
         else:
-            self.right = value
+            node = len(self._keys)
+            self._keys.append(key)
+            self._values.append(value)
+            self._left.append(0)
+            self._right.append(0)
+            self._red.append(True)
+        return node
+
+    def _free_node(self, node):
+        self._keys[node] = None
+        self._values[node] = None
+        self._left[node] = 0
+        self._right[node] = 0
+        self._free.append(node)
+
+    def _get_value_or_sentinel(self, key):
+        keys = self._keys
+        left = self._left
+        right = self._right
+        node = self._root
+        while node:
+            cmp = self._cmp(self._cmp_data, key, keys[node])
+            if cmp == 0:
+                return self._values[node]
+            elif cmp < 0:
+                node = left[node]
+            else:
+                node = right[node]
+        return _sentinel
+
+    def node_neighbors(self, key):
+        """T.node_neighbors(key) -> (node, prev_key, succ_key), where the keys are None
+        for the min and max key, raises KeyError if key does not exist.
+
+        The key of the node may be replaced (see: ``node_key_set``).
+        """
+        keys = self._keys
+        left = self._left
+        right = self._right
+        node = self._root
+        prev_node = 0
+        succ_node = 0
+        while node:
+            cmp = self._cmp(self._cmp_data, key, keys[node])
+            if cmp == 0:
+                break
+            elif cmp < 0:
+                succ_node = node
+                node = left[node]
+            else:
+                prev_node = node
+                node = right[node]
+
+        if not node:
+            raise KeyError(str(key))
+        if left[node]:
+            prev_node = left[node]
+            while right[prev_node]:
+                prev_node = right[prev_node]
+        if right[node]:
+            succ_node = right[node]
+            while left[succ_node]:
+                succ_node = left[succ_node]
+        # The null node has no key.
+        return node, keys[prev_node], keys[succ_node]
+
+    def pop_item(self):
+        """T.pop_item() -> (k, v), remove and return some (key, value) pair as a
+        2-tuple; but raise KeyError if T is empty.
+        """
+        if self.is_empty():
+            raise KeyError("pop_item(): tree is empty")
+        node = self._root
+        item = self._keys[node], self._values[node]
+        self.remove(item[0])
+        return item
+    popitem = pop_item  # for compatibility to dict()
+
+    def min_item(self):
+        """Get item with min key of tree, raises ValueError if tree is empty."""
+        if self.is_empty():
+            raise ValueError("Tree is empty")
+        left = self._left
+        node = self._root
+        while left[node]:
+            node = left[node]
+        return self._keys[node], self._values[node]
+
+    def max_item(self):
+        """Get item with max key of tree, raises ValueError if tree is empty."""
+        if self.is_empty():
+            raise ValueError("Tree is empty")
+        right = self._right
+        node = self._root
+        while right[node]:
+            node = right[node]
+        return self._keys[node], self._values[node]
+
+    def succ_item(self, key, default=_sentinel):
+        """Get successor (k,v) pair of key, raises KeyError if key is max key
+        or key does not exist.
+        """
+        keys = self._keys
+        left = self._left
+        right = self._right
+        node = self._root
+        succ_node = 0
+        while node:
+            cmp = self._cmp(self._cmp_data, key, keys[node])
+            if cmp == 0:
+                break
+            elif cmp < 0:
+                succ_node = node
+                node = left[node]
+            else:
+                node = right[node]
+
+        if not node:
+            if default is _sentinel:
+                raise KeyError(str(key))
+            return default
+        if right[node]:
+            succ_node = right[node]
+            while left[succ_node]:
+                succ_node = left[succ_node]
+        elif not succ_node:  # given key is biggest in tree
+            if default is _sentinel:
+                raise KeyError(str(key))
+            return default
+        return keys[succ_node], self._values[succ_node]
+
+    def prev_item(self, key, default=_sentinel):
+        """Get predecessor (k,v) pair of key, raises KeyError if key is min key
+        or key does not exist.
+        """
+        keys = self._keys
+        left = self._left
+        right = self._right
+        node = self._root
+        prev_node = 0
+        while node:
+            cmp = self._cmp(self._cmp_data, key, keys[node])
+            if cmp == 0:
+                break
+            elif cmp < 0:
+                node = left[node]
+            else:
+                prev_node = node
+                node = right[node]
+
+        if not node:
+            if default is _sentinel:
+                raise KeyError(str(key))
+            return default
+        if left[node]:
+            prev_node = left[node]
+            while right[prev_node]:
+                prev_node = right[prev_node]
+        elif not prev_node:  # given key is smallest in tree
+            if default is _sentinel:
+                raise KeyError(str(key))
+            return default
+        return keys[prev_node], self._values[prev_node]
+
+    def iter_keys_from(self, start_key):
+        """Iterates over keys in ascending order, starting with the first key >= start_key."""
+        keys = self._keys
+        for node in self.iter_nodes_from(start_key):
+            yield keys[node]
+
+    def iter_nodes_from(self, start_key):
+        """Iterates over nodes in ascending order, starting with the first key >= start_key.
+
+        The keys of the nodes may be replaced (see: ``node_key_set``).
+        """
+        keys = self._keys
+        left = self._left
+        right = self._right
+        node = self._root
+        stack = []
+        while node:
+            if self._cmp(self._cmp_data, start_key, keys[node]) <= 0:
+                stack.append(node)
+                node = left[node]
+            else:
+                node = right[node]
+
+        while stack:
+            node = stack.pop()
+            yield node
+            node = right[node]
+            while node:
+                stack.append(node)
+                node = left[node]
 
+    def iter_items(self, start_key=None, end_key=None, reverse=False):
+        """Iterates over the (key, value) items of the associated tree,
+        in ascending order if reverse is True, iterate in descending order,
+        reverse defaults to False"""
+        if self.is_empty():
+            return []
+        return self._iter_items(
+            *((self._right, self._left) if reverse else (self._left, self._right)),
+            start_key=start_key, end_key=end_key,
+        )
 
-class RBTree(_ABCTree):
-    """
-    RBTree implements a balanced binary tree with a dict-like interface.
+    def _iter_items(self, left, right, start_key=None, end_key=None):
+        keys = self._keys
+        values = self._values
+        in_range = self._get_in_range_func(start_key, end_key)
+        node = self._root
+        stack = []
+        while stack or node:
+            if node:
+                stack.append(node)
+                node = left[node]
+            else:
+                node = stack.pop()
+                if in_range(keys[node]):
+                    yield keys[node], values[node]
+                node = right[node]
 
-    see: http://en.wikipedia.org/wiki/Red_black_tree
-    """
     @staticmethod
-    def is_red(node):
-        if (node is not None) and node.red:
-            return True
+    def _single(left, right, red, root, direction):
+        if direction:
+            save = left[root]
+            left[root] = right[save]
+            right[save] = root
         else:
-            return False
-
-    @staticmethod
-    def jsw_single(root, direction):
-        other_side = 1 - direction
-        save = root[other_side]
-        root[other_side] = save[direction]
-        save[direction] = root
-        root.red = True
-        save.red = False
+            save = right[root]
+            right[root] = left[save]
+            left[save] = root
+        red[root] = True
+        red[save] = False
         return save
 
     @staticmethod
-    def jsw_double(root, direction):
-        other_side = 1 - direction
-        root[other_side] = RBTree.jsw_single(root[other_side], other_side)
-        return RBTree.jsw_single(root, direction)
-
-    def _new_node(self, key, value):
-        """Create a new tree node."""
-        self._count += 1
-        return Node(key, value)
+    def _double(left, right, red, root, direction):
+        if direction:
+            left[root] = RBTreeArena._single(left, right, red, left[root], 0)
+        else:
+            right[root] = RBTreeArena._single(left, right, red, right[root], 1)
+        return RBTreeArena._single(left, right, red, root, direction)
 
     def insert(self, key, value):
         """T.insert(key, value) <==> T[key] = value, insert key, value into tree."""
-        if self._root is None:  # Empty tree case
+        if not self._root:  # Empty tree case
             self._root = self._new_node(key, value)
-            self._root.red = False  # make root black
+            self._red[self._root] = False  # make root black
             return
 
-        head = Node()  # False tree root
-        grand_parent = None
+        cmp = self._cmp
+        cmp_data = self._cmp_data
+        keys = self._keys
+        left = self._left
+        right = self._right
+        red = self._red
+        single = RBTreeArena._single
+        double = RBTreeArena._double
+
+        head = RBTreeArena._HEAD  # False tree root
+        grand_parent = 0
         grand_grand_parent = head
-        parent = None  # parent
+        parent = 0
         direction = 0
         last = 0
 
         # Set up helpers
-        grand_grand_parent.right = self._root
-        node = grand_grand_parent.right
+        right[head] = node = self._root
         # Search down the tree
         while True:
-            if node is None:  # Insert new node at the bottom
+            is_new = not node
+            if is_new:  # Insert new node at the bottom
                 node = self._new_node(key, value)
-                parent[direction] = node
-            elif RBTree.is_red(node.left) and RBTree.is_red(node.right):  # Color flip
-                node.red = True
-                node.left.red = False
-                node.right.red = False
-
-            # Fix red violation
-            if RBTree.is_red(node) and RBTree.is_red(parent):
-                direction2 = 1 if grand_grand_parent.right is grand_parent else 0
-                if node is parent[last]:
-                    grand_grand_parent[direction2] = RBTree.jsw_single(grand_parent, 1 - last)
+                if direction:
+                    right[parent] = node
                 else:
-                    grand_grand_parent[direction2] = RBTree.jsw_double(grand_parent, 1 - last)
+                    left[parent] = node
+            else:
+                node_left = left[node]
+                node_right = right[node]
+                if red[node_left] and red[node_right]:  # Color flip
+                    red[node] = True
+                    red[node_left] = False
+                    red[node_right] = False
+
+            # Fix red violation (the null node is black)
+            if red[node] and red[parent]:
+                if node == (right[parent] if last else left[parent]):
+                    save = single(left, right, red, grand_parent, 1 - last)
+                else:
+                    save = double(left, right, red, grand_parent, 1 - last)
+                if right[grand_grand_parent] == grand_parent:
+                    right[grand_grand_parent] = save
+                else:
+                    left[grand_grand_parent] = save
+
+            # Stop if inserted (there is no need to compare the new node with its own key).
+            if is_new:
+                break
 
             # Stop if found
-            if self._cmp(self._cmp_data, key, node.key) == 0:
-                node.value = value  # set new value for key
+            cmp_result = cmp(cmp_data, key, keys[node])
+            if cmp_result == 0:
+                self._values[node] = value  # set new value for key
                 break
 
             last = direction
-            direction = 0 if (self._cmp(self._cmp_data, key, node.key) < 0) else 1
+            direction = 0 if (cmp_result < 0) else 1
             # Update helpers
-            if grand_parent is not None:
+            if grand_parent:
                 grand_grand_parent = grand_parent
             grand_parent = parent
             parent = node
-            node = node[direction]
+            node = right[node] if direction else left[node]
 
-        self._root = head.right  # Update root
-        self._root.red = False  # make root black
+        self._root = right[head]  # Update root
+        red[self._root] = False  # make root black
+        right[head] = 0
 
     def remove(self, key):
         """T.remove(key) <==> del T[key], remove item <key> from tree."""
-        if self._root is None:
+        if not self._root:
             raise KeyError(str(key))
-        head = Node()  # False tree root
+
+        cmp = self._cmp
+        cmp_data = self._cmp_data
+        keys = self._keys
+        left = self._left
+        right = self._right
+        red = self._red
+        single = RBTreeArena._single
+        double = RBTreeArena._double
+
+        head = RBTreeArena._HEAD  # False tree root
         node = head
-        node.right = self._root
-        parent = None
-        grand_parent = None
-        found = None  # Found item
+        right[head] = self._root
+        parent = 0
+        grand_parent = 0
+        found = 0  # Found item
         direction = 1
 
         # Search and push a red down
-        while node[direction] is not None:
+        while True:
+            child = right[node] if direction else left[node]
+            if not child:
+                break
             last = direction
 
             # Update helpers
             grand_parent = parent
             parent = node
-            node = node[direction]
-
-            direction = 1 if (self._cmp(self._cmp_data, node.key, key) < 0) else 0
-
-            # Save found node
-            if self._cmp(self._cmp_data, key, node.key) == 0:
-                found = node
+            node = child
+
+            if not found:
+                cmp_result = cmp(cmp_data, key, keys[node])
+                direction = 1 if (cmp_result > 0) else 0
+                # Save found node
+                if cmp_result == 0:
+                    found = node
+            else:
+                # Descend to the predecessor of the found node.
+                direction = 1
 
             # Push the red node down
-            if not RBTree.is_red(node) and not RBTree.is_red(node[direction]):
-                if RBTree.is_red(node[1 - direction]):
-                    parent[last] = RBTree.jsw_single(node, direction)
-                    parent = parent[last]
-                elif not RBTree.is_red(node[1 - direction]):
-                    sibling = parent[1 - last]
-                    if sibling is not None:
-                        if (not RBTree.is_red(sibling[1 - last])) and (not RBTree.is_red(sibling[last])):
+            if direction:
+                child, child_other = right[node], left[node]
+            else:
+                child, child_other = left[node], right[node]
+            if not red[node] and not red[child]:
+                if red[child_other]:
+                    save = single(left, right, red, node, direction)
+                    if last:
+                        right[parent] = save
+                    else:
+                        left[parent] = save
+                    parent = save
+                else:
+                    sibling = left[parent] if last else right[parent]
+                    if sibling:
+                        if last:
+                            sibling_last, sibling_other = right[sibling], left[sibling]
+                        else:
+                            sibling_last, sibling_other = left[sibling], right[sibling]
+                        if not red[sibling_other] and not red[sibling_last]:
                             # Color flip
-                            parent.red = False
-                            sibling.red = True
-                            node.red = True
+                            red[parent] = False
+                            red[sibling] = True
+                            red[node] = True
                         else:
-                            direction2 = 1 if grand_parent.right is parent else 0
-                            if RBTree.is_red(sibling[last]):
-                                grand_parent[direction2] = RBTree.jsw_double(parent, last)
-                            elif RBTree.is_red(sibling[1 - last]):
-                                grand_parent[direction2] = RBTree.jsw_single(parent, last)
+                            if red[sibling_last]:
+                                save = double(left, right, red, parent, last)
+                            else:
+                                save = single(left, right, red, parent, last)
+                            if right[grand_parent] == parent:
+                                right[grand_parent] = save
+                            else:
+                                left[grand_parent] = save
                             # Ensure correct coloring
-                            grand_parent[direction2].red = True
-                            node.red = True
-                            grand_parent[direction2].left.red = False
-                            grand_parent[direction2].right.red = False
+                            red[save] = True
+                            red[node] = True
+                            red[left[save]] = False
+                            red[right[save]] = False
 
         # Replace and remove if found
-        if found is not None:
-            found.key = node.key
-            found.value = node.value
-            parent[int(parent.right is node)] = node[int(node.left is None)]
-            node.free()
+        if found:
+            keys[found] = keys[node]
+            self._values[found] = self._values[node]
+            child = right[node] if not left[node] else left[node]
+            if right[parent] == node:
+                right[parent] = child
+            else:
+                left[parent] = child
+            self._free_node(node)
             self._count -= 1
 
         # Update root and make it black
-        self._root = head.right
-        if self._root is not None:
-            self._root.red = False
+        self._root = right[head]
+        right[head] = 0
+        if self._root:
+            red[self._root] = False
+        if not found:
+            raise KeyError(str(key))
+
+
+# ----------------------------------------------------------------------------
+# Sweep-Line Status
+#
+# Other types which may be used for the sweep-line (not from bintrees),
+# see: ``SweepStatus`` & ``SWEEP_STATUS_TYPES``.
+
+from random import Random
+
+
+class SweepStatus(object):
+    """
+    The sweep-line status: a sorted set of keys,
+    ordered by ``cmp(cmp_data, a, b)`` (returning a negative, zero or positive number).
+
+    The comparison depends on the position of the sweep-line, so keys must only be located by comparing them,
+    a status type must support:
+
+    Insert & Remove
+       ``insert(key, value)`` (the value is unused) & ``remove(key)`` (raising a ``KeyError`` when not found).
+    Neighbors
+       ``node_neighbors(key) -> (node, prev_key, succ_key)`` (raising a ``KeyError`` when not found),
+       the keys are None at either end. ``prev_key(key, default)`` & ``succ_key(key, default)``.
+    Range
+       ``iter_nodes_from(start_key)`` & ``iter_keys_from(start_key)``, iterating in ascending order
+       from the first key >= ``start_key``.
+    Nodes
+       ``node_key(node)`` & ``node_key_set(node, key)``, which replaces the key of a node
+       (as long as this doesn't change the order).
+       Nodes are only valid until the status is next modified.
+
+    As well as ``len(status)``, ``key in status`` & ``clear()``.
+
+    ``RBTree`` & ``RBTreeArena`` support these too,
+    this class implements all but insert, remove, node_neighbors, iter_nodes_from & the node access.
+    """
+    __slots__ = (
+        "_cmp",
+        "_cmp_data",
+        "_count",
+    )
+
+    def __init__(self, cmp=None, cmp_data=None):
+        if cmp is None:
+            def cmp(cmp_data, a, b):
+                if a < b:
+                    return -1
+                elif a > b:
+                    return 1
+                else:
+                    return 0
+        self._cmp = cmp
+        self._cmp_data = cmp_data
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def clear(self):
+        self.__init__(cmp=self._cmp, cmp_data=self._cmp_data)
+
+    def __contains__(self, key):
+        try:
+            self.node_neighbors(key)
+        except KeyError:
+            return False
+        return True
+
+    def prev_key(self, key, default=_sentinel):
+        """Get predecessor to key, raises KeyError if key is min key
+        or key does not exist.
+        """
+        try:
+            key_prev = self.node_neighbors(key)[1]
+        except KeyError:
+            key_prev = None
+        if key_prev is None:
+            if default is _sentinel:
+                raise KeyError(str(key))
+            return default
+        return key_prev
+
+    def succ_key(self, key, default=_sentinel):
+        """Get successor to key, raises KeyError if key is max key
+        or key does not exist.
+        """
+        try:
+            key_succ = self.node_neighbors(key)[2]
+        except KeyError:
+            key_succ = None
+        if key_succ is None:
+            if default is _sentinel:
+                raise KeyError(str(key))
+            return default
+        return key_succ
+
+    def iter_keys_from(self, start_key):
+        """Iterates over keys in ascending order, starting with the first key >= start_key."""
+        node_key = self.node_key
+        for node in self.iter_nodes_from(start_key):
+            yield node_key(node)
+
+
+# --------
+# SkipList
+
+class SkipNode(object):
+    """Internal object, represents a skip list node."""
+    __slots__ = ['key', 'next', 'prev']
+
+    def __init__(self, key, level):
+        self.key = key
+        # The next node for each level.
+        self.next = [None] * level
+        # The previous node (lowest level only).
+        self.prev = None
+
+
+class SkipList(SweepStatus):
+    """
+    A skip list, where each node is linked to the next at a random number of levels,
+    so keys are found by skipping along the highest levels first.
+
+    see: https://en.wikipedia.org/wiki/Skip_list
+    """
+    # Maximum number of levels.
+    LEVEL_MAX = 32
+    # The chance of a node being linked at the next level.
+    LEVEL_CHANCE = 0.25
+
+    __slots__ = (
+        "_head",
+        "_level",
+        "_random",
+    )
+
+    def __init__(self, cmp=None, cmp_data=None):
+        super().__init__(cmp=cmp, cmp_data=cmp_data)
+        self._head = SkipNode(None, SkipList.LEVEL_MAX)
+        self._level = 1
+        # Seeded, so results can be reproduced.
+        self._random = Random(self.LEVEL_MAX).random
+
+    def _find_prev(self, key, update=None):
+        """
+        Return the last node with a key less than ``key`` (the head when there is none)
+        filling in ``update`` with the last node at each level.
+        """
+        cmp = self._cmp
+        cmp_data = self._cmp_data
+        node = self._head
+        # The next node at the previous level is known to be greater or equal, skip comparing it again.
+        node_known = None
+        for level in range(self._level - 1, -1, -1):
+            node_next = node.next[level]
+            while (
+                    node_next is not None and
+                    node_next is not node_known and
+                    cmp(cmp_data, node_next.key, key) < 0
+            ):
+                node = node_next
+                node_next = node.next[level]
+            node_known = node_next
+            if update is not None:
+                update[level] = node
+        return node
+
+    def _find(self, key):
+        node = self._find_prev(key).next[0]
+        if node is None or self._cmp(self._cmp_data, key, node.key) != 0:
+            raise KeyError(str(key))
+        return node
+
+    def insert(self, key, value=None):
+        update = [None] * SkipList.LEVEL_MAX
+        node_prev = self._find_prev(key, update)
+        node_next = node_prev.next[0]
+        if node_next is not None and self._cmp(self._cmp_data, key, node_next.key) == 0:
+            return
+
+        level = 1
+        random = self._random
+        while level < SkipList.LEVEL_MAX and random() < SkipList.LEVEL_CHANCE:
+            level += 1
+        if level > self._level:
+            for i in range(self._level, level):
+                update[i] = self._head
+            self._level = level
+
+        node = SkipNode(key, level)
+        for i in range(level):
+            node.next[i] = update[i].next[i]
+            update[i].next[i] = node
+        if node_prev is not self._head:
+            node.prev = node_prev
+        if node_next is not None:
+            node_next.prev = node
+        self._count += 1
+
+    def remove(self, key):
+        update = [None] * SkipList.LEVEL_MAX
+        node = self._find_prev(key, update).next[0]
+        if node is None or self._cmp(self._cmp_data, key, node.key) != 0:
+            raise KeyError(str(key))
+
+        for i in range(len(node.next)):
+            update[i].next[i] = node.next[i]
+        if node.next[0] is not None:
+            node.next[0].prev = node.prev
+        head_next = self._head.next
+        while self._level > 1 and head_next[self._level - 1] is None:
+            self._level -= 1
+        self._count -= 1
+
+    def node_neighbors(self, key):
+        node = self._find(key)
+        node_prev = node.prev
+        node_next = node.next[0]
+        return (
+            node,
+            None if node_prev is None else node_prev.key,
+            None if node_next is None else node_next.key,
+        )
+
+    def iter_nodes_from(self, start_key):
+        node = self._find_prev(start_key).next[0]
+        while node is not None:
+            yield node
+            node = node.next[0]
+
+    def node_key(self, node):
+        return node.key
+
+    def node_key_set(self, node, key):
+        node.key = key
+
+
+# -------------
+# SortedBuckets
+
+class SortedBuckets(SweepStatus):
+    """
+    A sorted list of keys, split into buckets (sorted lists),
+    so inserting & removing only moves the keys of one bucket.
+
+    Keys are found with a binary search over the last key of each bucket, then within the bucket.
+    A node is a ``(bucket, index)`` pair.
+    """
+    # Split buckets larger than this.
+    BUCKET_MAX = 256
+
+    __slots__ = (
+        "_buckets",
+    )
+
+    def __init__(self, cmp=None, cmp_data=None):
+        super().__init__(cmp=cmp, cmp_data=cmp_data)
+        self._buckets = []
+
+    def _find(self, key):
+        """
+        Return ``(bucket_index, index, found)`` for the first key >= ``key``,
+        where ``found`` is true when the key is equal.
+        """
+        cmp = self._cmp
+        cmp_data = self._cmp_data
+        buckets = self._buckets
+        lo = 0
+        hi = len(buckets)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            bucket = buckets[mid]
+            cmp_result = cmp(cmp_data, bucket[-1], key)
+            if cmp_result < 0:
+                lo = mid + 1
+            elif cmp_result > 0:
+                hi = mid
+            else:
+                return mid, len(bucket) - 1, True
+        if lo == len(buckets):
+            return lo, 0, False
+        i = lo
+        bucket = buckets[i]
+        # The last key is known to be greater.
+        lo = 0
+        hi = len(bucket) - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            cmp_result = cmp(cmp_data, bucket[mid], key)
+            if cmp_result < 0:
+                lo = mid + 1
+            elif cmp_result > 0:
+                hi = mid
+            else:
+                return i, mid, True
+        return i, lo, False
+
+    def insert(self, key, value=None):
+        buckets = self._buckets
+        i, j, found = self._find(key)
+        if found:
+            return
+        if i == len(buckets):
+            if not buckets:
+                buckets.append([key])
+                self._count += 1
+                return
+            # Append to the last bucket.
+            i -= 1
+            j = len(buckets[i])
+        bucket = buckets[i]
+        bucket.insert(j, key)
+        if len(bucket) > SortedBuckets.BUCKET_MAX:
+            half = len(bucket) // 2
+            buckets[i:i + 1] = [bucket[:half], bucket[half:]]
+        self._count += 1
+
+    def remove(self, key):
+        i, j, found = self._find(key)
         if not found:
             raise KeyError(str(key))
+        bucket = self._buckets[i]
+        del bucket[j]
+        if not bucket:
+            del self._buckets[i]
+        self._count -= 1
+
+    def node_neighbors(self, key):
+        i, j, found = self._find(key)
+        if not found:
+            raise KeyError(str(key))
+        buckets = self._buckets
+        bucket = buckets[i]
+        if j != 0:
+            key_prev = bucket[j - 1]
+        elif i != 0:
+            key_prev = buckets[i - 1][-1]
+        else:
+            key_prev = None
+        if j + 1 != len(bucket):
+            key_succ = bucket[j + 1]
+        elif i + 1 != len(buckets):
+            key_succ = buckets[i + 1][0]
+        else:
+            key_succ = None
+        return (bucket, j), key_prev, key_succ
+
+    def iter_nodes_from(self, start_key):
+        i, j, _found = self._find(start_key)
+        buckets = self._buckets
+        while i < len(buckets):
+            bucket = buckets[i]
+            while j < len(bucket):
+                yield bucket, j
+                j += 1
+            i += 1
+            j = 0
+
+    def node_key(self, node):
+        bucket, j = node
+        return bucket[j]
+
+    def node_key_set(self, node, key):
+        bucket, j = node
+        bucket[j] = key
+
+
+# -------
+# AVLTree
+
+class AVLNode(object):
+    """Internal object, represents an AVL tree node."""
+    __slots__ = ['key', 'left', 'right', 'parent', 'height']
+
+    def __init__(self, key, parent):
+        self.key = key
+        self.left = None
+        self.right = None
+        self.parent = parent
+        self.height = 1
+
+
+class AVLTree(SweepStatus):
+    """
+    An AVL tree with parent pointers,
+    so neighbors & iteration follow the links between nodes without comparing keys.
+
+    see: https://en.wikipedia.org/wiki/AVL_tree
+    """
+    __slots__ = (
+        "_root",
+    )
+
+    def __init__(self, cmp=None, cmp_data=None):
+        super().__init__(cmp=cmp, cmp_data=cmp_data)
+        self._root = None
+
+    def _find(self, key):
+        cmp = self._cmp
+        cmp_data = self._cmp_data
+        node = self._root
+        while node is not None:
+            cmp_result = cmp(cmp_data, key, node.key)
+            if cmp_result == 0:
+                return node
+            node = node.left if (cmp_result < 0) else node.right
+        raise KeyError(str(key))
+
+    @staticmethod
+    def _node_prev(node):
+        if node.left is not None:
+            node = node.left
+            while node.right is not None:
+                node = node.right
+            return node
+        while node.parent is not None and node.parent.left is node:
+            node = node.parent
+        return node.parent
+
+    @staticmethod
+    def _node_succ(node):
+        if node.right is not None:
+            node = node.right
+            while node.left is not None:
+                node = node.left
+            return node
+        while node.parent is not None and node.parent.right is node:
+            node = node.parent
+        return node.parent
+
+    @staticmethod
+    def _node_height_update(node):
+        height_left = 0 if node.left is None else node.left.height
+        height_right = 0 if node.right is None else node.right.height
+        node.height = 1 + (height_left if height_left > height_right else height_right)
+
+    def _replace_child(self, parent, node, child):
+        if parent is None:
+            self._root = child
+        elif parent.left is node:
+            parent.left = child
+        else:
+            parent.right = child
+
+    def _rotate_left(self, node):
+        pivot = node.right
+        node.right = pivot.left
+        if pivot.left is not None:
+            pivot.left.parent = node
+        pivot.parent = node.parent
+        self._replace_child(node.parent, node, pivot)
+        pivot.left = node
+        node.parent = pivot
+        AVLTree._node_height_update(node)
+        AVLTree._node_height_update(pivot)
+        return pivot
+
+    def _rotate_right(self, node):
+        pivot = node.left
+        node.left = pivot.right
+        if pivot.right is not None:
+            pivot.right.parent = node
+        pivot.parent = node.parent
+        self._replace_child(node.parent, node, pivot)
+        pivot.right = node
+        node.parent = pivot
+        AVLTree._node_height_update(node)
+        AVLTree._node_height_update(pivot)
+        return pivot
+
+    def _rebalance(self, node):
+        """Re-balance from ``node`` up to the root, stopping once a height is unchanged."""
+        while node is not None:
+            height_left = 0 if node.left is None else node.left.height
+            height_right = 0 if node.right is None else node.right.height
+            if height_left > height_right + 1:
+                child = node.left
+                if (
+                        (0 if child.left is None else child.left.height) <
+                        (0 if child.right is None else child.right.height)
+                ):
+                    self._rotate_left(child)
+                node = self._rotate_right(node)
+            elif height_right > height_left + 1:
+                child = node.right
+                if (
+                        (0 if child.right is None else child.right.height) <
+                        (0 if child.left is None else child.left.height)
+                ):
+                    self._rotate_right(child)
+                node = self._rotate_left(node)
+            else:
+                height = 1 + (height_left if height_left > height_right else height_right)
+                if node.height == height:
+                    break
+                node.height = height
+            node = node.parent
+
+    def insert(self, key, value=None):
+        node = self._root
+        if node is None:
+            self._root = AVLNode(key, None)
+            self._count += 1
+            return
+        cmp = self._cmp
+        cmp_data = self._cmp_data
+        while True:
+            cmp_result = cmp(cmp_data, key, node.key)
+            if cmp_result == 0:
+                return
+            if cmp_result < 0:
+                if node.left is None:
+                    node.left = AVLNode(key, node)
+                    break
+                node = node.left
+            else:
+                if node.right is None:
+                    node.right = AVLNode(key, node)
+                    break
+                node = node.right
+        self._count += 1
+        self._rebalance(node)
+
+    def remove(self, key):
+        node = self._find(key)
+        if node.left is not None and node.right is not None:
+            # Replace the key with its successor, removing the successor's node instead.
+            node_succ = node.right
+            while node_succ.left is not None:
+                node_succ = node_succ.left
+            node.key = node_succ.key
+            node = node_succ
+        child = node.left if node.left is not None else node.right
+        parent = node.parent
+        if child is not None:
+            child.parent = parent
+        self._replace_child(parent, node, child)
+        self._count -= 1
+        self._rebalance(parent)
+
+    def node_neighbors(self, key):
+        node = self._find(key)
+        node_prev = AVLTree._node_prev(node)
+        node_succ = AVLTree._node_succ(node)
+        return (
+            node,
+            None if node_prev is None else node_prev.key,
+            None if node_succ is None else node_succ.key,
+        )
+
+    def iter_nodes_from(self, start_key):
+        cmp = self._cmp
+        cmp_data = self._cmp_data
+        node = self._root
+        node_start = None
+        while node is not None:
+            if cmp(cmp_data, start_key, node.key) <= 0:
+                node_start = node
+                node = node.left
+            else:
+                node = node.right
+        node = node_start
+        while node is not None:
+            yield node
+            node = AVLTree._node_succ(node)
+
+    def node_key(self, node):
+        return node.key
+
+    def node_key_set(self, node, key):
+        node.key = key
+
+
+# Types which can be passed as the ``status`` argument of ``isect_segments_sweep``.
+SWEEP_STATUS_TYPES = {
+    'rbtree': RBTree,
+    'rbtree_arena': RBTreeArena,
+    'skiplist': SkipList,
+    'buckets': SortedBuckets,
+    'avl': AVLTree,
+}
@@ -0,0 +1,303 @@
+
+"""
+Benchmarks (not run as part of the tests).
+
+Example of benchmarking each number type:
+  python3 tests/benchmark.py number_types
+
+Only some of the test data may be used by passing their names, e.g:
+  python3 tests/benchmark.py number_types test_isect_suzzane test_none_maze
+"""
+
+import sys
+import os
+import time
+
+POLY_ISECT_MODULE_PATH = os.path.join(os.path.dirname(__file__), "..")
+TEST_DATA_PATH = os.path.join(os.path.dirname(__file__), "data")
+
+sys.path.append(POLY_ISECT_MODULE_PATH)
+sys.path.append(TEST_DATA_PATH)
+
+import poly_point_isect
+
+# Number of times to run each test (the fastest time is used).
+REPEAT = int(os.environ.get("REPEAT", "3"))
+
+
+def test_data_names():
+    return sorted(
+        f[:-3] for f in os.listdir(TEST_DATA_PATH)
+        if f.endswith(".py")
+    )
+
+
+def test_data_load(name):
+    return __import__(name).data
+
+
+def time_best(fn, *args, **kwargs):
+    result = None
+    for _ in range(REPEAT):
+        time_start = time.perf_counter()
+        fn(*args, **kwargs)
+        time_delta = time.perf_counter() - time_start
+        if result is None or time_delta < result:
+            result = time_delta
+    return result
+
+
+def print_table(header, rows):
+    rows = [header] + rows
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    for row in rows:
+        print("  ".join(
+            (value.ljust(width) if i == 0 else value.rjust(width))
+            for i, (value, width) in enumerate(zip(row, widths))
+        ))
+
+
+# ----------------------------------------------------------------------------
+# Number Types
+
+def benchmark_number_types(names):
+    """
+    Time ``isect_segments`` with each number type,
+    relative times are shown in brackets (compared with the first number type).
+    """
+    number_types = []
+    for number_type in poly_point_isect.NUMBER_TYPES:
+        try:
+            poly_point_isect.number_type_module(number_type)
+        except ImportError as ex:
+            print("Skipping %r: %s" % (number_type, ex))
+            continue
+        number_types.append(number_type)
+
+    rows = []
+    for name in names:
+        s = test_data_load(name)
+        row = [name]
+        time_ref = None
+        for number_type in number_types:
+            try:
+                time_delta = time_best(poly_point_isect.isect_segments, s, number_type=number_type)
+            except Exception as ex:
+                # Some number types are known not to pass all tests.
+                row.append("error (%s)" % type(ex).__name__)
+                continue
+            if time_ref is None:
+                time_ref = time_delta
+            row.append("%.4f (%.1fx)" % (time_delta, time_delta / time_ref))
+        rows.append(row)
+    print_table(["name"] + number_types, rows)
+
+
+# ----------------------------------------------------------------------------
+# Orthogonal Segments
+
+def benchmark_orthogonal(names):
+    """
+    Time the sweep with & without intersecting horizontal & vertical segments separately.
+    """
+    rows = []
+    for name in names:
+        s = test_data_load(name)
+        row = [name]
+        time_ref = None
+        for orthogonal in (False, True):
+            try:
+                time_delta = time_best(poly_point_isect.isect_segments_sweep, s, orthogonal=orthogonal, families=False)
+            except Exception as ex:
+                row.append("error (%s)" % type(ex).__name__)
+                continue
+            if time_ref is None:
+                time_ref = time_delta
+            row.append("%.4f (%.1fx)" % (time_delta, time_delta / time_ref))
+        rows.append(row)
+    print_table(["name", "general", "orthogonal"], rows)
+
+
+# ----------------------------------------------------------------------------
+# Segment Families
+
+def benchmark_families(names):
+    """
+    Time the sweep with & without intersecting families of parallel segments separately.
+    """
+    rows = []
+    for name in names:
+        s = test_data_load(name)
+        row = [name]
+        time_ref = None
+        for families in (False, True):
+            try:
+                time_delta = time_best(poly_point_isect.isect_segments_sweep, s, families=families)
+            except Exception as ex:
+                row.append("error (%s)" % type(ex).__name__)
+                continue
+            if time_ref is None:
+                time_ref = time_delta
+            row.append("%.4f (%.1fx)" % (time_delta, time_delta / time_ref))
+        rows.append(row)
+    print_table(["name", "general", "families"], rows)
+
+
+# ----------------------------------------------------------------------------
+# Tree
+
+def benchmark_tree(names):
+    """
+    Count comparisons for each tree operation (the test data names are ignored),
+    inserting, looking up the neighbors of & removing shuffled keys.
+    """
+    import random
+
+    rows = []
+    for tree_type, size in [
+            (tree_type, size)
+            for tree_type in (poly_point_isect.RBTree, poly_point_isect.RBTreeArena)
+            for size in (100, 1000, 10000, 100000)
+    ]:
+        keys = list(range(size))
+        random.Random(size).shuffle(keys)
+        calls = [0]
+
+        def cmp(cmp_data, a, b):
+            calls[0] += 1
+            return -1 if a < b else (1 if a > b else 0)
+
+        def run():
+            tree = tree_type(cmp=cmp)
+            calls_op = []
+            for fn in (
+                    lambda: [tree.insert(k, None) for k in keys],
+                    lambda: [(tree.prev_key(k, None), tree.succ_key(k, None)) for k in keys],
+                    lambda: [tree.remove(k) for k in keys],
+            ):
+                calls[0] = 0
+                fn()
+                calls_op.append(calls[0] / size)
+            return calls_op
+
+        calls_op = run()
+        time_delta = time_best(run)
+        rows.append(
+            [tree_type.__name__, str(size)] +
+            ["%.2f" % c for c in calls_op] +
+            ["%.4f" % time_delta],
+        )
+    print_table(["tree", "size", "insert", "neighbors", "remove", "time"], rows)
+
+
+# ----------------------------------------------------------------------------
+# Sweep-Line Status
+
+def segments_random(n, length, seed):
+    import random
+    rng = random.Random(seed)
+    s = []
+    for _ in range(n):
+        x, y = rng.random(), rng.random()
+        s.append(((x, y), (x + (rng.random() - 0.5) * length, y + (rng.random() - 0.5) * length)))
+    return s
+
+
+def benchmark_status(names):
+    """
+    Time the sweep with each type of sweep-line status,
+    for the test data & random segments (``random_<number>``, appended when no names are passed).
+
+    Run with ``pypy3`` to compare the types with a JIT.
+    """
+    if len(sys.argv) <= 2:
+        names = names + ["random_%d" % n for n in (500, 1000, 2000, 4000)]
+    status_types = list(poly_point_isect.SWEEP_STATUS_TYPES)
+
+    rows = []
+    for name in names:
+        if name.startswith("random_"):
+            n = int(name[7:])
+            # Keep the number of intersections proportional to the number of segments.
+            s = segments_random(n, 2.0 / n ** 0.5, n)
+        else:
+            s = test_data_load(name)
+        row = [name]
+        time_ref = None
+        for status in status_types:
+            try:
+                time_delta = time_best(
+                    poly_point_isect.isect_segments_sweep, s,
+                    orthogonal=False, families=False, status=status,
+                )
+            except Exception as ex:
+                row.append("error (%s)" % type(ex).__name__)
+                continue
+            if time_ref is None:
+                time_ref = time_delta
+            row.append("%.4f (%.1fx)" % (time_delta, time_delta / time_ref))
+        rows.append(row)
+    print_table(["name"] + status_types, rows)
+
+
+# ----------------------------------------------------------------------------
+# Intersector
+
+def polygons_small(n, count, seed):
+    """
+    Return ``count`` polygons with ``n`` vertices (every tenth self-intersecting).
+    """
+    import random
+    from math import sin, cos, pi
+    rng = random.Random(seed)
+    polygons = []
+    for i in range(count):
+        phase = rng.random() * 2.0 * pi
+        points = []
+        for j in range(n):
+            angle = j * 2.0 * pi / n
+            radius = 1.0 + 0.3 * sin(3.0 * angle + phase) + 0.2 * rng.random() / n
+            points.append((cos(angle) * radius, sin(angle) * radius))
+        if i % 10 == 0:
+            points[0], points[1] = points[1], points[0]
+        polygons.append(points)
+    return polygons
+
+
+def benchmark_intersector(names):
+    """
+    Time intersecting many small polygons with ``isect_polygon`` & a reused ``Intersector``
+    (the test data names are ignored), times are per polygon.
+    """
+    isector = poly_point_isect.Intersector()
+    rows = []
+    for n in (3, 10, 50, 200):
+        polygons = polygons_small(n, max(10, 20000 // n), n)
+        row = [str(n)]
+        for fn in (poly_point_isect.isect_polygon, isector.isect_polygon):
+            time_delta = time_best(lambda: [fn(points) for points in polygons])
+            row.append("%.1f us" % (time_delta / len(polygons) * 1e6))
+        rows.append(row)
+    print_table(["vertices", "isect_polygon", "Intersector"], rows)
+
+
+BENCHMARKS = {
+    "number_types": benchmark_number_types,
+    "orthogonal": benchmark_orthogonal,
+    "families": benchmark_families,
+    "tree": benchmark_tree,
+    "status": benchmark_status,
+    "intersector": benchmark_intersector,
+}
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in BENCHMARKS:
+        print("Usage: benchmark.py {%s} [test_data_name ...]" % ",".join(BENCHMARKS))
+        sys.exit(1)
+    names = sys.argv[2:] or test_data_names()
+    BENCHMARKS[sys.argv[1]](names)
+
+
+if __name__ == '__main__':
+    main()
@@ -8,6 +8,8 @@ import sys
 import os
 import unittest
 
+from fractions import Fraction
+
 # Export results to SVG?
 USE_SVG = os.environ.get("USE_SVG")
 # USE_SVG = True
@@ -232,6 +234,1110 @@ class IsectTest(unittest.TestCase, TestDataFile_Helper):
         self.assertTestData("test_isect_spiro_01")
 
 
+def test_data_load_polygon(name):
+    # Test data is stored as segments, use the first point of each.
+    return [s[0] for s in test_data_load(name)]
+
+
+class PolygonTest(unittest.TestCase):
+    """
+    Tests for polygon & poly-line input (edges connected by their vertices).
+    """
+
+    def assertPolygonData(self, name):
+        points = test_data_load_polygon(name)
+        ix_final = tuple(sorted(set(poly_point_isect.isect_polygon(points))))
+        ix_naive = tuple(sorted(set(poly_point_isect.isect_polygon__naive(points))))
+        self.assertEqual(ix_final, ix_naive)
+        self.assertEqual(ix_final, isect_segments(test_data_load(name)))
+
+        ix_final = tuple(sorted(set(poly_point_isect.isect_polyline(points))))
+        ix_naive = tuple(sorted(set(poly_point_isect.isect_polyline__naive(points))))
+        self.assertEqual(ix_final, ix_naive)
+
+    def test_scribble(self):
+        self.assertPolygonData("test_isect_scribble_01")
+
+    def test_chains(self):
+        # Two crossing waves, connected as x-monotone chains.
+        from math import sin, cos
+        points = (
+            [(i / 50.0, sin(i / 5.0)) for i in range(200)] +
+            [(i / 50.0, cos(i / 5.0) * 0.9) for i in reversed(range(200))]
+        )
+        ix_final = tuple(sorted(set(poly_point_isect.isect_polygon(points))))
+        self.assertEqual(ix_final, tuple(sorted(set(poly_point_isect.isect_polygon__naive(points)))))
+        self.assertEqual(ix_final, isect_segments(poly_point_isect.polygon_segments(points)[0]))
+        self.assertEqual(len(ix_final), 13)
+
+    def test_polyline_open(self):
+        # The closing edge of the bow-tie is the only one crossing.
+        points = ((0.0, 0.0), (1.0, 0.0), (0.0, 1.0), (1.0, 1.0))
+        self.assertEqual(poly_point_isect.isect_polygon(points), [(0.5, 0.5)])
+        self.assertEqual(poly_point_isect.isect_polyline(points), [])
+        self.assertEqual(poly_point_isect.isect_polyline(points + points[:1]), [(0.5, 0.5)])
+
+
+class PolygonsTest(unittest.TestCase):
+    """
+    Tests for multiple rings intersected in a single sweep.
+    """
+
+    @staticmethod
+    def rings_from_data(name):
+        points = test_data_load_polygon(name)
+        # A second copy of the ring, offset so it crosses the first.
+        return [points, [(x + 0.25, y + 0.125) for x, y in points]]
+
+    def test_scribble_pair(self):
+        rings = self.rings_from_data("test_isect_scribble_01")
+        ret = poly_point_isect.isect_polygons(rings)
+        ix_final = tuple(sorted(set(p for p, _ids in ret)))
+        ix_naive = tuple(sorted(set(poly_point_isect.isect_polygons__naive(rings))))
+        self.assertEqual(ix_final, ix_naive)
+
+        ret_inter = poly_point_isect.isect_polygons(rings, ring_filter='INTER')
+        ret_intra = poly_point_isect.isect_polygons(rings, ring_filter='INTRA')
+        for _p, ids in ret_inter:
+            self.assertEqual({ring_id for ring_id, _edge_id in ids}, {0, 1})
+        for _p, ids in ret_intra:
+            ring_ids = [ring_id for ring_id, _edge_id in ids]
+            self.assertNotEqual(len(set(ring_ids)), len(ring_ids))
+        self.assertTrue(ret_inter and ret_intra)
+        self.assertEqual(set(ix_final), set(p for p, _ids in ret_inter + ret_intra))
+
+        # Intersections within a ring match intersecting the ring on its own.
+        ret_single = isect_segments(test_data_load("test_isect_scribble_01"))
+        self.assertEqual(
+            ret_single,
+            tuple(sorted(set(p for p, ids in ret_intra if ids[0][0] == 0))),
+        )
+
+    def test_ids(self):
+        square = ((0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.0, 1.0))
+        bar = ((-1.0, 0.25), (2.0, 0.25), (2.0, 0.5), (-1.0, 0.5))
+        ret = sorted(poly_point_isect.isect_polygons([square, bar]))
+        self.assertEqual(ret, [
+            ((0.0, 0.25), [(0, 3), (1, 0)]),
+            ((0.0, 0.5), [(0, 3), (1, 2)]),
+            ((1.0, 0.25), [(0, 1), (1, 0)]),
+            ((1.0, 0.5), [(0, 1), (1, 2)]),
+        ])
+        self.assertEqual(poly_point_isect.isect_polygons([square, bar], ring_filter='INTRA'), [])
+
+    def test_shared_edge(self):
+        # Both squares are included for the edge they share (only swept once).
+        square_a = ((0.0, 0.0), (2.0, 0.0), (2.0, 2.0), (0.0, 2.0))
+        square_b = ((2.0, 0.0), (4.0, 0.0), (4.0, 2.0), (2.0, 2.0))
+        tri = ((1.0, 1.0), (3.0, 1.0), (3.0, 3.0))
+        ret = sorted(poly_point_isect.isect_polygons([square_a, square_b, tri]))
+        self.assertEqual(ret, [
+            ((2.0, 1.0), [(0, 1), (1, 3), (2, 0)]),
+            # The triangle passes through the top of the shared edge.
+            ((2.0, 2.0), [(0, 1), (0, 2), (1, 2), (1, 3), (2, 2)]),
+            ((3.0, 2.0), [(1, 2), (2, 1)]),
+        ])
+
+
+class PolygonCrossingPairsTest(unittest.TestCase):
+    """
+    Tests for finding which polygons cross each other.
+    """
+
+    @staticmethod
+    def square(x, y, size=1.0):
+        return ((x, y), (x + size, y), (x + size, y + size), (x, y + size))
+
+    def test_squares(self):
+        polygons = [
+            self.square(0.0, 0.0),
+            # Crosses 0 & 2.
+            self.square(0.5, 0.5),
+            # Shares an edge with 0 (touching isn't crossing).
+            self.square(1.0, 0.0),
+            # Isolated.
+            self.square(10.0, 10.0),
+            # Overlaps 3's X bounds only.
+            self.square(10.5, 0.0),
+            # Contained by 0 (no edges cross).
+            self.square(0.25, 0.25, 0.125),
+        ]
+        self.assertEqual(
+            poly_point_isect.polygon_crossing_pairs(polygons),
+            [(0, 1), (1, 2)],
+        )
+        self.assertEqual(
+            poly_point_isect.polygon_bounds_overlap(polygons),
+            [True, True, True, False, False, True],
+        )
+
+    def test_scribble_pair(self):
+        points = test_data_load_polygon("test_isect_scribble_01")
+        polygons = [points, [(x + 0.25, y + 0.125) for x, y in points], [(x + 4.0, y) for x, y in points]]
+        self.assertEqual(poly_point_isect.polygon_crossing_pairs(polygons), [(0, 1)])
+
+    def test_touching_vertex(self):
+        # The squares touch at (2, 2), where the triangle passes through (the squares still don't cross).
+        square_a = self.square(0.0, 0.0, 2.0)
+        square_b = self.square(2.0, 0.0, 2.0)
+        tri = ((1.0, 1.0), (3.0, 1.0), (3.0, 3.0))
+        self.assertEqual(poly_point_isect.polygon_crossing_pairs([square_a, square_b]), [])
+        self.assertEqual(poly_point_isect.polygon_crossing_pairs([square_a, square_b, tri]), [(0, 2), (1, 2)])
+
+
+class NodeSegmentsTest(unittest.TestCase):
+    """
+    Tests for splitting segments at their intersections.
+    """
+
+    def assertNodeData(self, name):
+        s = test_data_load(name)
+        ix = isect_segments(s)
+        s_noded = poly_point_isect.node_segments(s)
+        # Intersections are now shared end-points.
+        self.assertEqual(isect_segments(s_noded), ())
+        self.assertEqual(len(s_noded), len(s) + sum(
+            len(segments) for _p, segments in poly_point_isect.isect_segments_include_segments(s)))
+
+        vertices, edges = poly_point_isect.node_segments_graph(s)
+        self.assertEqual(len(edges), len(s_noded))
+        self.assertEqual([(vertices[v0], vertices[v1]) for v0, v1, _index in edges], s_noded)
+        self.assertTrue(set(ix).issubset(vertices))
+
+    def test_crosshatch(self):
+        self.assertNodeData("test_isect_crosshatch_01")
+
+    def test_scribble(self):
+        self.assertNodeData("test_isect_scribble_01")
+
+    def test_cross_direction(self):
+        s = (((1.0, 0.0), (-1.0, 0.0)), ((0.0, -1.0), (0.0, 1.0)))
+        self.assertEqual(poly_point_isect.node_segments(s), [
+            ((1.0, 0.0), (0.0, 0.0)),
+            ((0.0, 0.0), (-1.0, 0.0)),
+            ((0.0, -1.0), (0.0, 0.0)),
+            ((0.0, 0.0), (0.0, 1.0)),
+        ])
+
+
+class IndexResultsTest(unittest.TestCase):
+    """
+    Tests for intersections referencing input segments by index.
+    """
+
+    def test_scatter(self):
+        s = test_data_load("test_isect_scatter_01")
+        points, pairs, aliases = poly_point_isect.isect_segments_index_pairs(s)
+        self.assertEqual(aliases, {})
+        self.assertEqual(tuple(sorted(set(points))), isect_segments(s))
+        for p, (i, j) in zip(points, pairs):
+            self.assertLess(i, j)
+            self.assertEqual(poly_point_isect.isect_seg_seg_v2_point(*s[i], *s[j]), p)
+
+        points_csr, offsets, point_indices, aliases = poly_point_isect.isect_segments_index_csr(s)
+        self.assertEqual(len(offsets), len(s) + 1)
+        pairs_csr = {}
+        for i in range(len(s)):
+            for point_index in point_indices[offsets[i]:offsets[i + 1]]:
+                pairs_csr.setdefault(point_index, []).append(i)
+        self.assertEqual(
+            sorted(pairs),
+            sorted((i, j) for indices in pairs_csr.values() for n, i in enumerate(indices) for j in indices[n + 1:]),
+        )
+
+    def test_aliases(self):
+        s = (
+            ((1.0, 0.0), (-1.0, 0.0)),
+            ((0.0, 1.0), (0.0, -1.0)),
+            # Same as the first (reversed).
+            ((-1.0, 0.0), (1.0, 0.0)),
+            # Zero length.
+            ((0.0, 0.0), (0.0, 0.0)),
+            ((0.0, 1.0), (0.0, -1.0)),
+        )
+        points, pairs, aliases = poly_point_isect.isect_segments_index_pairs(s)
+        self.assertEqual((points, pairs, aliases), ([(0.0, 0.0)], [(0, 1)], {2: 0, 4: 1}))
+        self.assertEqual(
+            poly_point_isect.isect_segments_index_csr(s),
+            ([(0.0, 0.0)], [0, 1, 2, 2, 2, 2], [0, 0], {2: 0, 4: 1}),
+        )
+        stats = {}
+        poly_point_isect.isect_segments(s, stats=stats)
+        self.assertEqual((stats["segments_degenerate"], stats["segments_duplicate"]), (1, 2))
+
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, "NumPy not found")
+class ArrayInputTest(unittest.TestCase):
+    """
+    Tests for segments passed as a NumPy array.
+    """
+
+    def test_data(self):
+        for name in ("test_isect_suzzane", "test_isect_crosshatch_02", "test_none_circle"):
+            s = test_data_load(name)
+            # Add duplicate & zero length segments.
+            s = list(s) + [s[1], (s[2][1], s[2][0]), (s[3][0], s[3][0]), s[1]]
+            for axis in ('X', 'Y', 'AUTO'):
+                stats = {}
+                stats_array = {}
+                ix = tuple(sorted(set(poly_point_isect.isect_segments(s, axis=axis, stats=stats))))
+                ix_array = tuple(sorted(set(poly_point_isect.isect_segments(
+                    numpy.array(s), axis=axis, stats=stats_array,
+                ))))
+                self.assertEqual(ix, ix_array)
+                self.assertEqual(stats, stats_array)
+                self.assertEqual((stats["segments_degenerate"], stats["segments_duplicate"]), (1, 3))
+
+    def test_aliases(self):
+        s = (
+            ((1.0, 0.0), (-1.0, 0.0)),
+            ((0.0, 1.0), (0.0, -1.0)),
+            ((-1.0, 0.0), (1.0, 0.0)),
+            ((0.0, 0.0), (0.0, 0.0)),
+            ((0.0, 1.0), (0.0, -1.0)),
+        )
+        self.assertEqual(
+            poly_point_isect.isect_segments_index_pairs(numpy.array(s)),
+            poly_point_isect.isect_segments_index_pairs(s),
+        )
+        # Without validating, segments are only ordered left -> right.
+        s_array = numpy.array(s)
+        self.assertEqual(
+            poly_point_isect.segments_preprocess_array(s_array, False),
+            ([tuple(sorted(seg)) for seg in s], None, {}, 0),
+        )
+        # The input isn't modified.
+        self.assertEqual(s_array.tolist(), [[list(p) for p in seg] for seg in s])
+
+
+class IsectRectTest(unittest.TestCase):
+    """
+    Tests for intersections within a rectangle.
+    """
+
+    def assertRectData(self, name):
+        s = test_data_load(name)
+        ix = isect_segments(s)
+        for rect in (
+                (-1.0, -1.0, 1.0, 1.0),
+                (-0.5, -0.25, 0.25, 0.5),
+                (0.0, 0.0, 0.1, 0.1),
+                (10.0, 10.0, 11.0, 11.0),
+        ):
+            x_min, y_min, x_max, y_max = rect
+            self.assertEqual(
+                tuple(sorted(poly_point_isect.isect_segments_in_rect(s, *rect))),
+                tuple(p for p in ix if (x_min <= p[0] <= x_max) and (y_min <= p[1] <= y_max)),
+            )
+
+    def test_scatter(self):
+        self.assertRectData("test_isect_scatter_01")
+
+    def test_crosshatch(self):
+        self.assertRectData("test_isect_crosshatch_03")
+
+
+def segments_star(n, center):
+    """
+    Return ``n`` segments crossing at ``center``
+    (computed intersections differ slightly from float precision error).
+    """
+    from math import sin, cos, radians
+    s = []
+    for i in range(n):
+        angle = radians(i * (180.0 / n) + 0.3)
+        x, y = cos(angle), sin(angle)
+        s.append((
+            (center[0] - x * 0.37, center[1] - y * 0.37),
+            (center[0] + x * 0.53, center[1] + y * 0.53),
+        ))
+    return s
+
+
+class IsectToleranceTest(unittest.TestCase):
+    """
+    Tests for merging near-coincident intersection points.
+    """
+
+    def test_star(self):
+        for n in range(2, 13):
+            for center in ((0.1, 0.7 / 3), (0.3, 0.1 / 7), (1 / 3, 1 / 9)):
+                ret = poly_point_isect.isect_segments_include_segments(
+                    segments_star(n, center), tolerance=1e-9)
+                self.assertEqual(len(ret), 1)
+                p, segments = ret[0]
+                self.assertLess(poly_point_isect.len_squared_v2v2(p, center), 1e-18)
+                self.assertEqual(len(segments), n)
+
+    def test_data(self):
+        # Intersections in the test data are further apart than the tolerance.
+        for name in ("test_isect_crosshatch_03", "test_isect_scatter_01", "test_isect_suzzane"):
+            s = test_data_load(name)
+            self.assertEqual(
+                tuple(sorted(poly_point_isect.isect_segments(s, tolerance=1e-10))),
+                isect_segments(s),
+            )
+
+    def test_routes(self):
+        # A tolerance smaller than the distance between intersections doesn't change the result,
+        # including inputs intersected without the sweep-line (orthogonal segments & segment families).
+        # Overlapping colinear segments are a known limitation (see ``IsectDegenerate``).
+        names = sorted(
+            name[:-3] for name in os.listdir(TEST_DATA_PATH)
+            if name.startswith("test_") and name.endswith(".py") and "colinear" not in name
+        )
+        for s in (
+                *(test_data_load(name) for name in names),
+                *(
+                    [((float(x0), float(y0)), (float(x1), float(y1))) for (x0, y0), (x1, y1) in segments_grid(12, seed=seed)]
+                    for seed in range(20)
+                ),
+                segments_orthogonal(50, 0),
+                segments_orthogonal(50, 10),
+                segments_hatch(20, (0.0, 90.0)),
+                segments_hatch(10, (10.0, 70.0, 130.0)),
+        ):
+            self.assertEqual(
+                tuple(sorted(poly_point_isect.isect_segments(s, tolerance=1e-9))),
+                tuple(sorted(poly_point_isect.isect_segments(s))),
+            )
+
+
+def segments_to_int(s, scale=1e6):
+    return [
+        ((round(x0 * scale), round(y0 * scale)), (round(x1 * scale), round(y1 * scale)))
+        for (x0, y0), (x1, y1) in s
+    ]
+
+
+class IsectExactTest(unittest.TestCase):
+    """
+    Tests for exact intersections of segments with integer coordinates.
+    """
+
+    def assertExactData(self, name):
+        s = segments_to_int(test_data_load(name))
+        ix_final = tuple(sorted(set(poly_point_isect.isect_segments_exact(s))))
+        ix_naive = tuple(sorted(set(poly_point_isect.isect_segments_exact__naive(s))))
+        self.assertEqual(ix_final, ix_naive)
+
+    def test_bowtie_circle(self):
+        self.assertExactData("test_isect_bowtie_circle_01")
+
+    def test_crosshatch(self):
+        self.assertExactData("test_isect_crosshatch_01")
+
+    def test_suzzane(self):
+        self.assertExactData("test_isect_suzzane")
+
+    def test_maze(self):
+        self.assertExactData("test_none_maze")
+
+    def test_star(self):
+        # Segments crossing at a single point, with vertical & horizontal segments.
+        s = [((-x, -y), (x * 3, y * 3)) for x, y in ((1, 0), (0, 1), (1, 1), (7, 3), (3, 7), (-5, 2), (-1, 9))]
+        s = [((a[0] + 11, a[1] - 5), (b[0] + 11, b[1] - 5)) for a, b in s]
+        ret = poly_point_isect.isect_segments_exact_include_segments(s)
+        self.assertEqual(len(ret), 1)
+        self.assertEqual(ret[0][0], (11.0, -5.0))
+        self.assertEqual(len(ret[0][1]), len(s))
+
+    def test_view(self):
+        s = segments_to_int(test_data_load("test_isect_suzzane"))
+        ret = poly_point_isect.isect_segments_exact(s)
+        ret_list = list(ret)
+        self.assertEqual(len(ret), len(ret_list))
+        self.assertEqual(ret, ret_list)
+        self.assertEqual([ret[i] for i in range(len(ret))], ret_list)
+        self.assertEqual(ret[-3:], ret_list[-3:])
+        self.assertIs(type(ret[0][0]), float)
+        if numpy is not None:
+            self.assertEqual(ret.to_array().tolist(), [list(p) for p in ret_list])
+
+    def test_non_integer(self):
+        with self.assertRaises(TypeError):
+            poly_point_isect.isect_segments_exact(test_data_load("test_isect_cross_01"))
+
+
+class IsectRobustTest(unittest.TestCase):
+    """
+    Tests for exact intersections of segments with float coordinates.
+    """
+
+    def assertRobustData(self, name):
+        s = test_data_load(name)
+        stats = {}
+        ix_final = tuple(sorted(set(poly_point_isect.isect_segments_robust(s, stats=stats))))
+        ix_naive = isect_segments__naive(s)
+        self.assertEqual(len(ix_final), len(ix_naive))
+        for p_final, p_naive in zip(ix_final, ix_naive):
+            self.assertLess(poly_point_isect.len_squared_v2v2(p_final, p_naive), 1e-20)
+        self.assertLess(stats["predicate_exact_count"], stats["predicate_count"])
+
+    def test_bowtie_circle(self):
+        self.assertRobustData("test_isect_bowtie_circle_01")
+
+    def test_crosshatch(self):
+        self.assertRobustData("test_isect_crosshatch_02")
+
+    def test_suzzane(self):
+        self.assertRobustData("test_isect_suzzane")
+
+    def test_maze(self):
+        self.assertRobustData("test_none_maze")
+
+    def test_star(self):
+        for n in range(2, 13):
+            center = (0.1, 0.7 / 3)
+            for p in poly_point_isect.isect_segments_robust(segments_star(n, center)):
+                self.assertLess(poly_point_isect.len_squared_v2v2(p, center), 1e-20)
+
+    def test_exact_point(self):
+        # The correctly rounded intersection (no error from float calculation).
+        s = (((0.0, 0.0), (3.0, 1.0)), ((0.0, 1.0), (3.0, 0.0)))
+        self.assertEqual(poly_point_isect.isect_segments_robust(s), [(1.5, 0.5)])
+        s = (((0.1, 0.0), (0.1, 0.3)), ((0.0, 0.0), (0.3, 0.7)))
+        self.assertEqual(poly_point_isect.isect_segments_robust(s), [(0.1, float(Fraction(0.7) * Fraction(0.1) / Fraction(0.3)))])
+
+    def test_exponent_range(self):
+        # Scaled coordinates too large for floats (only compared with exact arithmetic).
+        s = [
+            ((0.0, 0.0), (1e300, 1e300)),
+            ((0.0, 1e300), (1e300, 0.0)),
+            ((1e-300, 0.5), (0.9, 0.5)),
+        ]
+        self.assertEqual(sorted(poly_point_isect.isect_segments_robust(s)), [(0.5, 0.5), (5e299, 5e299)])
+        # A slope too steep for a float.
+        s.append(((1e-300, -1.0), (2e-300, 1e300)))
+        ix = poly_point_isect.isect_segments_robust(s)
+        self.assertIn((1e-300, 0.5), ix)
+
+
+class NumberTypeTest(unittest.TestCase):
+    """
+    Tests for choosing the number type for each call.
+    """
+
+    def test_number_types(self):
+        import decimal
+        precision = decimal.getcontext().prec
+        for name in ("test_isect_bowtie_01", "test_isect_crosshatch_02", "test_none_circle"):
+            s = test_data_load(name)
+            ix = isect_segments(s)
+            for number_type in ("native", "decimal", "fraction"):
+                ix_number_type = tuple(sorted(set(poly_point_isect.isect_segments(s, number_type=number_type))))
+                self.assertEqual(len(ix_number_type), len(ix))
+                for p, p_number_type in zip(ix, ix_number_type):
+                    self.assertIs(type(p_number_type[0]), float)
+                    self.assertLess(poly_point_isect.len_squared_v2v2(p, p_number_type), 1e-20)
+        self.assertEqual(decimal.getcontext().prec, precision)
+
+    def test_decimal_precision(self):
+        import decimal
+        import pickle
+        precision = decimal.getcontext().prec
+        s = (((0.1, 0.0), (0.1, 0.3)), ((0.0, 0.05), (0.3, 0.7)))
+        self.assertEqual(
+            poly_point_isect.isect_segments(s, number_type='decimal', decimal_precision=6),
+            [(0.1, 0.266667)],
+        )
+        self.assertEqual(
+            poly_point_isect.isect_segments(s, number_type='decimal', decimal_precision=40),
+            poly_point_isect.isect_segments_robust(s),
+        )
+        self.assertEqual(decimal.getcontext().prec, precision)
+        with self.assertRaises(ValueError):
+            poly_point_isect.isect_segments(s, decimal_precision=6)
+
+        # Modules for other number types can be resolved by name.
+        module = poly_point_isect.number_type_module('decimal')
+        self.assertIs(pickle.loads(pickle.dumps(module.isect_segments)), module.isect_segments)
+
+    def test_number_type_unknown(self):
+        with self.assertRaises(ValueError):
+            poly_point_isect.isect_segments(test_data_load("test_isect_cross_01"), number_type='unknown')
+
+
+def segments_vertical_grid(x_steps, y_steps):
+    """
+    Return stacked vertical segments (with gaps) crossing diagonal segments.
+    """
+    s = []
+    for i in range(x_steps):
+        x = (i + 0.5) / x_steps
+        for j in range(y_steps):
+            # Alternate overlapping and disjoint vertical segments.
+            y = j / y_steps
+            s.append(((x, y + 0.01), (x, y + (0.73 if j % 2 else 0.37) / y_steps)))
+    for j in range(y_steps):
+        y = (j + 0.3) / y_steps
+        s.append(((-0.1, y), (1.1, y + 0.13)))
+        s.append(((-0.1, y + 0.21), (1.1, y - 0.17)))
+    return s
+
+
+class IsectVerticalTest(unittest.TestCase):
+    """
+    Tests for vertical segments (checked together for each X value).
+    """
+
+    def assertVerticalData(self, s):
+        ix = isect_segments(s)
+        ix_naive = isect_segments__naive(s)
+        self.assertEqual(len(ix), len(ix_naive))
+        for p, p_naive in zip(ix, ix_naive):
+            self.assertLess(poly_point_isect.len_squared_v2v2(p, p_naive), 1e-20)
+
+    def test_grid(self):
+        self.assertVerticalData(segments_vertical_grid(7, 11))
+
+    def test_grid_swap(self):
+        # Swap X/Y so the vertical segments are horizontal.
+        s = segments_vertical_grid(7, 11)
+        self.assertVerticalData([((v0[1], v0[0]), (v1[1], v1[0])) for v0, v1 in s])
+
+    def test_maze(self):
+        s = test_data_load("test_none_maze")
+        self.assertEqual(isect_segments(s), ())
+
+
+class IntersectorTest(unittest.TestCase):
+    """
+    Tests for reusing an intersector for multiple calls.
+    """
+
+    def test_data(self):
+        isector = poly_point_isect.Intersector()
+        # Run twice, so sweep-lines of each type are reused (including orthogonal segments).
+        for _ in range(2):
+            for name in ("test_isect_suzzane", "test_none_maze", "test_isect_crosshatch_01", "test_isect_scribble_01"):
+                s = test_data_load(name)
+                self.assertEqual(tuple(sorted(set(isector.isect_segments(s)))), isect_segments(s))
+                self.assertEqual(
+                    sorted(isector.isect_segments_include_segments(s)),
+                    sorted(poly_point_isect.isect_segments_include_segments(s)),
+                )
+
+    def test_polygon(self):
+        isector = poly_point_isect.Intersector()
+        for name in ("test_isect_scribble_01", "test_isect_bowtie_circle_01", "test_none_circle"):
+            points = test_data_load_polygon(name)
+            for fn_name in (
+                    "isect_polygon",
+                    "isect_polygon_include_segments",
+                    "isect_polyline",
+                    "isect_polyline_include_segments",
+            ):
+                self.assertEqual(
+                    getattr(isector, fn_name)(points, ordered=True),
+                    getattr(poly_point_isect, fn_name)(points, ordered=True),
+                )
+
+    def test_tolerance(self):
+        s = segments_star(8, (0.5, 0.5))
+        isector = poly_point_isect.Intersector(tolerance=1e-9)
+        for _ in range(2):
+            self.assertEqual(len(isector.isect_segments(s)), 1)
+
+
+class IsectOrderedTest(unittest.TestCase):
+    """
+    Tests for intersections ordered by point.
+    """
+
+    def assertOrdered(self, ret, ret_unordered, key=None):
+        self.assertEqual(list(ret), sorted(ret, key=key))
+        self.assertEqual(sorted(ret, key=key), sorted(ret_unordered, key=key))
+
+    def test_data(self):
+        # Includes orthogonal segments & segment families (intersected without the sweep-line).
+        for name in ("test_isect_suzzane", "test_isect_scatter_01", "test_isect_crosshatch_01", "test_none_maze"):
+            s = test_data_load(name)
+            for axis in ('X', 'Y'):
+                self.assertOrdered(
+                    poly_point_isect.isect_segments(s, axis=axis, ordered=True),
+                    poly_point_isect.isect_segments(s, axis=axis),
+                )
+                self.assertOrdered(
+                    poly_point_isect.isect_segments_include_segments(s, axis=axis, ordered=True),
+                    poly_point_isect.isect_segments_include_segments(s, axis=axis),
+                    key=lambda item: item[0],
+                )
+
+    def test_polygon(self):
+        points = test_data_load_polygon("test_isect_scribble_01")
+        self.assertOrdered(
+            poly_point_isect.isect_polygon(points, ordered=True),
+            poly_point_isect.isect_polygon(points),
+        )
+
+    def test_number_type(self):
+        s = test_data_load("test_isect_suzzane")
+        self.assertOrdered(
+            poly_point_isect.isect_segments(s, number_type='fraction', ordered=True),
+            poly_point_isect.isect_segments(s, number_type='fraction'),
+        )
+
+
+class SweepMonitorTest(unittest.TestCase):
+    """
+    Tests for progress reporting, cancellation & limits.
+    """
+
+    def assertInterrupted(self, reason, s, monitor, **kwargs):
+        with self.assertRaises(poly_point_isect.SweepInterrupted) as cm:
+            poly_point_isect.isect_segments(s, monitor=monitor, **kwargs)
+        ex = cm.exception
+        self.assertEqual(ex.reason, reason)
+        # The intersections found so far.
+        self.assertLessEqual(set(ex.result), set(poly_point_isect.isect_segments(s, **kwargs)))
+        return ex
+
+    def test_progress(self):
+        s = test_data_load("test_isect_scatter_01")
+        calls = []
+        monitor = poly_point_isect.SweepMonitor(progress=lambda *args: calls.append(args), step=10)
+        self.assertEqual(tuple(sorted(set(poly_point_isect.isect_segments(s, monitor=monitor)))), isect_segments(s))
+        # Checked before the first event.
+        self.assertEqual(calls[0][0], None)
+        self.assertGreater(len(calls), 2)
+        for (x_prev, _, _, count_prev), (x, queue_size, sweep_size, count) in zip(calls[1:], calls[2:]):
+            self.assertLessEqual(x_prev, x)
+            self.assertLessEqual(count_prev, count)
+            self.assertGreaterEqual(queue_size, 0)
+            self.assertGreaterEqual(sweep_size, 0)
+
+    def test_limits(self):
+        s = test_data_load("test_isect_scatter_01")
+        for kwargs in (dict(max_intersections=20), dict(max_events=100)):
+            monitor = poly_point_isect.SweepMonitor(step=10, **kwargs)
+            ex = self.assertInterrupted(tuple(kwargs)[0], s, monitor, ordered=True)
+            self.assertGreater(len(ex.result), 0)
+            self.assertEqual(ex.result, sorted(ex.result))
+            self.assertEqual(len(ex.result), len(ex.sweep_line.intersections))
+
+    def test_cancel(self):
+        import threading
+        import time
+        cancel = threading.Event()
+        cancel.set()
+        s = test_data_load("test_isect_suzzane")
+        for reason, monitor in (
+                ('cancelled', poly_point_isect.SweepMonitor(cancel=cancel)),
+                ('deadline', poly_point_isect.SweepMonitor(deadline=time.monotonic())),
+        ):
+            ex = self.assertInterrupted(reason, s, monitor)
+            self.assertEqual(ex.result, [])
+            with self.assertRaises(poly_point_isect.SweepInterrupted) as cm:
+                poly_point_isect.isect_segments_include_segments(s, monitor=monitor)
+            self.assertEqual(cm.exception.result, [])
+
+    def test_orthogonal(self):
+        # Pairs of orthogonal segments & segment families are counted as events.
+        for s in (segments_orthogonal(100, 0), segments_hatch(10, (5, 65))):
+            monitor = poly_point_isect.SweepMonitor(step=10, max_events=50)
+            self.assertInterrupted('max_events', s, monitor)
+
+    def test_number_type(self):
+        s = test_data_load("test_isect_scatter_01")
+        monitor = poly_point_isect.SweepMonitor(step=10, max_intersections=20)
+        ex = self.assertInterrupted('max_intersections', s, monitor, number_type='fraction')
+        self.assertIsInstance(ex.result[0][0], float)
+
+    def test_step_invalid(self):
+        with self.assertRaises(ValueError):
+            poly_point_isect.SweepMonitor(step=0)
+
+
+class SweepAxisTest(unittest.TestCase):
+    """
+    Tests for sweeping along the Y axis.
+    """
+
+    def assertAxisData(self, s, axis_expected):
+        ix = isect_segments(s)
+        for axis in ('Y', 'AUTO'):
+            stats = {}
+            ix_axis = tuple(sorted(set(poly_point_isect.isect_segments(s, axis=axis, stats=stats))))
+            self.assertEqual(stats["axis"], axis_expected if axis == 'AUTO' else axis)
+            self.assertEqual(len(ix_axis), len(ix))
+            for p, p_axis in zip(ix, ix_axis):
+                self.assertLess(poly_point_isect.len_squared_v2v2(p, p_axis), 1e-20)
+
+    def test_vertical_grid(self):
+        # Vertical segments are cheaper to handle than horizontal segments.
+        self.assertAxisData(segments_vertical_grid(7, 11), 'X')
+
+    def test_tall(self):
+        import random
+        rng = random.Random(1)
+        s = []
+        for _ in range(300):
+            x, y = rng.random(), rng.random() * 20.0
+            s.append(((x, y), (x + rng.uniform(-0.5, 0.5), y + rng.uniform(-1.0, 1.0))))
+        self.assertAxisData(s, 'Y')
+        self.assertAxisData([((v0[1], v0[0]), (v1[1], v1[0])) for v0, v1 in s], 'X')
+
+    def test_data(self):
+        for name in ("test_isect_crosshatch_02", "test_isect_scatter_01", "test_none_maze"):
+            self.assertAxisData(test_data_load(name), 'X')
+
+    def test_include_segments(self):
+        s = segments_vertical_grid(3, 3)
+
+        def segment_sets(axis):
+            return sorted(
+                sorted(tuple(sorted(segment)) for segment in segments)
+                for p, segments in poly_point_isect.isect_segments_include_segments(s, axis=axis)
+            )
+        self.assertEqual(segment_sets('X'), segment_sets('Y'))
+
+    def test_axis_unknown(self):
+        with self.assertRaises(ValueError):
+            poly_point_isect.isect_segments(test_data_load("test_isect_cross_01"), axis='Z')
+
+
+def segments_orthogonal(n, n_diagonal, seed=1):
+    """
+    Return ``n`` horizontal & ``n`` vertical segments, as well as ``n_diagonal`` other segments.
+    """
+    import random
+    rng = random.Random(seed)
+    s = []
+    for _ in range(n):
+        x, y = rng.random(), rng.random()
+        s.append(((x, y), (x + rng.uniform(0.01, 0.3), y)))
+        x, y = rng.random(), rng.random()
+        s.append(((x, y), (x, y + rng.uniform(0.01, 0.3))))
+    for _ in range(n_diagonal):
+        s.append(((rng.random(), rng.random()), (rng.random(), rng.random())))
+    return s
+
+
+def segments_grid(n, size=6, seed=1):
+    """
+    Return ``n`` segments with integer coordinates on a small grid (mostly horizontal & vertical),
+    so many segments meet at end-points, without any overlapping colinear segments (a known limitation).
+    """
+    import random
+    rng = random.Random(seed)
+    s = []
+    while len(s) < n:
+        x0, y0 = rng.randint(0, size), rng.randint(0, size)
+        axis = rng.randint(0, 2)
+        x1 = x0 if axis == 0 else rng.randint(0, size)
+        y1 = y0 if axis == 1 else rng.randint(0, size)
+        if (x0, y0) == (x1, y1):
+            continue
+        dx, dy = x1 - x0, y1 - y0
+        if any(
+                (dx * (y - y0) - dy * (x - x0)) == 0 and (dx * (y_other - y0) - dy * (x_other - x0)) == 0
+                for (x, y), (x_other, y_other) in s
+        ):
+            continue
+        s.append(((x0, y0), (x1, y1)))
+    return s
+
+
+class IsectOrthogonalTest(unittest.TestCase):
+    """
+    Tests for horizontal & vertical segments (intersected separately).
+    """
+
+    def assertOrthogonalData(self, s):
+        ix = isect_segments(s)
+        self.assertEqual(ix, isect_segments__naive(s))
+        self.assertEqual(
+            ix,
+            tuple(sorted(set(poly_point_isect.isect_segments_sweep(s, orthogonal=False, families=False).get_intersections()))),
+        )
+
+    def test_orthogonal(self):
+        self.assertOrthogonalData(segments_orthogonal(100, 0))
+
+    def test_mixed(self):
+        self.assertOrthogonalData(segments_orthogonal(100, 10))
+        self.assertOrthogonalData(segments_orthogonal(30, 30))
+
+    def test_t_junction(self):
+        # A horizontal segment starting on a vertical segment.
+        s = [((0.5, 0.0), (0.5, 1.0)), ((0.5, 0.6), (1.0, 0.6)), ((0.0, 0.3), (0.5, 0.3)), ((0.5, 1.0), (0.9, 1.0))]
+        self.assertEqual(isect_segments(s), ((0.5, 0.3), (0.5, 0.6)))
+        # The general sweep finds the same intersections (with or without other segments).
+        self.assertOrthogonalData(s)
+        self.assertOrthogonalData(s + [((2.0, 2.0), (3.0, 2.5))])
+        self.assertEqual(tuple(sorted(poly_point_isect.isect_segments(s, tolerance=1e-9))), ((0.5, 0.3), (0.5, 0.6)))
+        self.assertEqual(
+            sorted(poly_point_isect.isect_segments_exact([((5, 0), (5, 10)), ((5, 6), (10, 6))])),
+            [(5.0, 6.0)],
+        )
+
+    def test_t_junction_diagonal(self):
+        # A diagonal segment starting on a vertical segment (with other segments or on its own).
+        s = [((0.5, 0.0), (0.5, 1.0)), ((0.5, 0.6), (1.0, 0.8))]
+        self.assertEqual(isect_segments(s), ((0.5, 0.6),))
+        self.assertOrthogonalData(s)
+        self.assertOrthogonalData(s + [((0.0, 0.2), (1.0, 0.2)), ((0.7, 1.0), (0.9, 0.1))])
+        # Connected edges (continuing an x-monotone chain at the vertical segment).
+        points = [(0.0, 0.5), (0.5, 0.6), (1.0, 0.8), (1.0, 1.5), (0.5, 1.5), (0.5, 0.0)]
+        self.assertEqual(
+            tuple(sorted(poly_point_isect.isect_polyline(points))),
+            tuple(sorted(set(poly_point_isect.isect_polyline__naive(points)))),
+        )
+
+    def test_start_on_segment(self):
+        # Segments starting on another segment (or a vertical segment) at the same point.
+        for s in (
+                [((3.0, 4.0), (1.0, 3.0)), ((1.0, 1.0), (1.0, 5.0)), ((5.0, 5.0), (1.0, 1.0)),
+                 ((4.0, 4.0), (3.0, 1.0)), ((2.0, 3.0), (1.0, 3.0))],
+                [((1.0, 2.0), (0.0, 2.0)), ((5.0, 3.0), (4.0, 1.0)), ((3.0, 0.0), (0.0, 2.0)),
+                 ((0.0, 0.0), (0.0, 5.0)), ((3.0, 0.0), (1.0, 1.0))],
+                [((4.0, 3.0), (3.0, 3.0)), ((5.0, 5.0), (1.0, 1.0)), ((6.0, 0.0), (3.0, 3.0)),
+                 ((4.0, 5.0), (6.0, 1.0))],
+        ):
+            self.assertOrthogonalData(s)
+            self.assertEqual(
+                sorted(p for p, _segments in poly_point_isect.isect_segments_include_segments(s)),
+                list(isect_segments__naive(s)),
+            )
+
+    def test_routes(self):
+        # Every way of sweeping finds the same intersections (many segments meet at end-points).
+        for seed in range(300):
+            s_int = segments_grid(2 + (seed % 7), seed=seed)
+            s = [((float(x0), float(y0)), (float(x1), float(y1))) for (x0, y0), (x1, y1) in s_int]
+            ix = isect_segments__naive(s)
+            for ix_route in (
+                    poly_point_isect.isect_segments(s),
+                    poly_point_isect.isect_segments_sweep(s, orthogonal=False, families=False).get_intersections(),
+                    poly_point_isect.isect_segments(s, tolerance=1e-6),
+                    poly_point_isect.isect_segments_exact(s_int),
+                    poly_point_isect.isect_segments_robust(s),
+                    *(
+                        poly_point_isect.isect_segments_sweep(s, orthogonal=False, status=status).get_intersections()
+                        for status in poly_point_isect.SWEEP_STATUS_TYPES
+                    ),
+            ):
+                self.assertEqual(tuple(sorted(set((float(x), float(y)) for x, y in ix_route))), ix, s_int)
+
+    def test_include_segments(self):
+        s = segments_orthogonal(20, 5)
+        self.assertEqual(
+            sorted((p, sorted(segments)) for p, segments in poly_point_isect.isect_segments_include_segments(s)),
+            sorted(
+                (p, sorted(segments)) for p, segments in
+                poly_point_isect.isect_segments_sweep(s, orthogonal=False, families=False).get_intersections_with_segments()
+            ),
+        )
+
+    def test_polygon(self):
+        # A staircase crossed by a square.
+        points = [(float(i // 2), float((i + 1) // 2)) for i in range(20)] + [(10.0, 0.0)]
+        self.assertEqual(
+            tuple(sorted(poly_point_isect.isect_polygon(points))),
+            tuple(sorted(poly_point_isect.isect_polygon__naive(points))),
+        )
+        s = [((2.5, 1.5), (7.5, 1.5)), ((7.5, 1.5), (7.5, 6.5)), ((7.5, 6.5), (2.5, 6.5)), ((2.5, 6.5), (2.5, 1.5))]
+        self.assertOrthogonalData(poly_point_isect.polygon_segments(points)[0] + s)
+
+
+def segments_hatch(n, angles, clip=True):
+    """
+    Return ``n`` parallel segments for each angle (in degrees),
+    clipped to a circle when ``clip`` is true (otherwise all the same length).
+    """
+    from math import sin, cos, radians
+    s = []
+    for angle in angles:
+        dx, dy = cos(radians(angle)), sin(radians(angle))
+        for i in range(n):
+            offset = ((i + 0.5) / n) * 2.0 - 1.0
+            length = (1.0 - offset * offset) ** 0.5 if clip else 1.0
+            x, y = -dy * offset, dx * offset
+            s.append(((x - dx * length, y - dy * length), (x + dx * length, y + dy * length)))
+    return s
+
+
+class IsectFamiliesTest(unittest.TestCase):
+    """
+    Tests for families of parallel segments (intersected separately).
+    """
+
+    def assertFamiliesData(self, s, is_families=True):
+        self.assertEqual(
+            poly_point_isect.events_families_from_segments(
+                [(v0, v1) if v0 <= v1 else (v1, v0) for v0, v1 in s], range(len(s)), None,
+            ) is not None,
+            is_families,
+        )
+        ix = isect_segments(s)
+        self.assertEqual(ix, isect_segments__naive(s))
+        self.assertEqual(
+            ix,
+            tuple(sorted(set(poly_point_isect.isect_segments_sweep(s, families=False).get_intersections()))),
+        )
+
+    def test_hatch(self):
+        self.assertFamiliesData(segments_hatch(40, (10.0, 70.0)))
+        self.assertFamiliesData(segments_hatch(20, (5.0, 50.0, 95.0, 140.0)))
+
+    def test_lattice(self):
+        self.assertFamiliesData(segments_hatch(20, (0.0, 60.0, 120.0), clip=False))
+
+    def test_data(self):
+        for name in ("test_isect_crosshatch_01", "test_isect_crosshatch_03", "test_isect_crosshatch_04"):
+            self.assertFamiliesData(test_data_load(name))
+
+    def test_fallback(self):
+        # Too many families.
+        self.assertFamiliesData(segments_hatch(4, (0.0, 33.0, 61.0, 97.0, 128.0)), False)
+        # Nearly parallel families.
+        self.assertFamiliesData(segments_hatch(5, (0.0, 0.01)), False)
+        # Overlapping segments in the same family.
+        self.assertFamiliesData(
+            segments_hatch(5, (10.0, 70.0)) + [((-1.0, 0.0), (1.0, 0.0)), ((0.0, 0.0), (2.0, 0.0))],
+            False,
+        )
+
+
+class IsectStarTest(unittest.TestCase):
+    """
+    Tests for many segments crossing at a single point (re-ordered in place in the sweep-line).
+    """
+
+    def test_star(self):
+        s = []
+        for cx, cy in ((0, 0), (40, 3), (17, 25)):
+            s.extend(
+                ((float(cx - x), float(cy - y)), (float(cx + x * 3), float(cy + y * 3)))
+                for x, y in ((1, 0), (0, 1), (1, 1), (7, 3), (3, 7), (-5, 2), (-1, 9), (2, -9))
+            )
+        ret = poly_point_isect.isect_segments_include_segments(s)
+        self.assertEqual(
+            sorted((p, len(segments)) for p, segments in ret if len(segments) > 2),
+            [((-0.0, -0.0), 8), ((17.0, 25.0), 8), ((40.0, 3.0), 8)],
+        )
+        self.assertEqual(isect_segments(s), isect_segments__naive(s))
+
+    def test_data(self):
+        for name in ("test_isect_crosshatch_01", "test_isect_bowtie_circle_01", "test_isect_suzzane"):
+            s = test_data_load(name)
+            self.assertEqual(
+                tuple(sorted(set(poly_point_isect.isect_segments_sweep(s, families=False).get_intersections()))),
+                isect_segments__naive(s),
+            )
+
+
+class RBTreeTest(unittest.TestCase):
+    """
+    Tests for the tree used by the sweep-line & event queue.
+    """
+
+    def assertTreeRandom(self, tree_type):
+        import random
+        rng = random.Random(1)
+        tree = tree_type()
+        keys = set()
+        for _ in range(5000):
+            k = rng.randrange(200)
+            if rng.random() < 0.55:
+                tree.insert(k, None)
+                keys.add(k)
+            elif k in keys:
+                tree.remove(k)
+                keys.remove(k)
+            else:
+                with self.assertRaises(KeyError):
+                    tree.remove(k)
+            self.assertEqual(len(tree), len(keys))
+        keys = sorted(keys)
+        self.assertEqual(list(tree.iter_keys_from(keys[0])), keys)
+        for k_prev, k, k_succ in zip([None] + keys, keys, keys[1:] + [None]):
+            self.assertEqual(tree.prev_key(k, None), k_prev)
+            self.assertEqual(tree.succ_key(k, None), k_succ)
+        return tree
+
+    def test_random(self):
+        self.assertTreeRandom(poly_point_isect.RBTree)
+
+    def test_random_arena(self):
+        tree = self.assertTreeRandom(poly_point_isect.RBTreeArena)
+        # Removed nodes are reused.
+        self.assertLessEqual(len(tree._keys), 200 + 2)
+        # Copies don't share nodes.
+        tree_copy = tree.copy()
+        tree_copy.insert(-1, None)
+        tree.remove(tree.min_key())
+        self.assertEqual(tree_copy.min_key(), -1)
+        self.assertEqual(len(tree_copy), len(tree) + 2)
+
+
+class SweepStatusTest(unittest.TestCase):
+    """
+    Tests for each type of sweep-line status.
+    """
+
+    def assertStatusData(self, s, ix_expect, segments_next=None):
+        for status in poly_point_isect.SWEEP_STATUS_TYPES:
+            sweep_line = poly_point_isect.isect_segments_sweep(
+                s, segments_next=segments_next, orthogonal=False, families=False, status=status,
+            )
+            self.assertEqual(tuple(sorted(set(sweep_line.get_intersections()))), ix_expect, status)
+
+    def test_data(self):
+        for name in ("test_isect_crosshatch_01", "test_isect_suzzane", "test_isect_scribble_01", "test_none_maze"):
+            s = test_data_load(name)
+            self.assertStatusData(s, isect_segments__naive(s))
+
+    def test_vertical_grid(self):
+        s = segments_vertical_grid(7, 11)
+        self.assertStatusData(s, isect_segments__naive(s))
+
+    def test_chains(self):
+        from math import sin, cos
+        points = (
+            [(i / 50.0, sin(i / 5.0)) for i in range(200)] +
+            [(i / 50.0, cos(i / 5.0) * 0.9) for i in reversed(range(200))]
+        )
+        s, segments_next = poly_point_isect.polygon_segments(points)
+        self.assertStatusData(
+            s, tuple(sorted(set(poly_point_isect.isect_polygon__naive(points)))), segments_next=segments_next,
+        )
+
+    def test_status_unknown(self):
+        with self.assertRaises(ValueError):
+            poly_point_isect.isect_segments_sweep([((0.0, 0.0), (1.0, 1.0))], status='list')
+
+    def test_random(self):
+        import random
+        rng = random.Random(1)
+        for status, status_type in poly_point_isect.SWEEP_STATUS_TYPES.items():
+            tree = status_type()
+            keys = set()
+            for _ in range(5000):
+                k = rng.randrange(600)
+                if rng.random() < 0.55:
+                    tree.insert(k, None)
+                    keys.add(k)
+                elif k in keys:
+                    tree.remove(k)
+                    keys.remove(k)
+                else:
+                    with self.assertRaises(KeyError):
+                        tree.remove(k)
+            keys = sorted(keys)
+            self.assertEqual(len(tree), len(keys), status)
+            self.assertEqual(list(tree.iter_keys_from(-1)), keys, status)
+            for k_prev, k, k_succ in zip([None] + keys, keys, keys[1:] + [None]):
+                self.assertEqual(tree.node_neighbors(k)[1:], (k_prev, k_succ), status)
+
+
 if __name__ == '__main__':
     unittest.main()
 